@@ -0,0 +1,276 @@
+"""
+Replay desktop and web client sessions against a running server.
+
+Start the server as it is deployed (e.g. `gunicorn config.wsgi`), make sure
+the account exists (`python manage.py create_demo_user`), then from the
+backend directory:
+
+    python -m benchmarks.load --clients 8 --duration 60
+    python -m benchmarks.load --clients 32 --rows 1000 100000 --web-ratio 0.7 --output load.json
+    python -m benchmarks.load --base-url http://staging:8000/api --username ops --password ...
+
+Each client is a thread looping over sessions shaped like the ones
+frontend-desktop/api_client.py and frontend-web/src/api.js issue:
+
+    desktop: history (login), history, summary + full data (column layout) per selection,
+             sometimes an upload (then summary + data of it) and a PDF
+    web:     history (login), summary + charts + first data pages per
+             selection, sometimes an upload and a PDF
+
+Only the standard library is used, so the generator can run on any box that
+can reach the server. It shares the CPU with the server when both run on one
+machine; keep that in mind when reading the numbers.
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import math
+import random
+import re
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+from .synthetic import generate_csv
+
+PERCENTILES = (50, 90, 95, 99)
+WEB_PAGE_ROWS = 1000  # matches PAGE_ROWS in frontend-web/src/App.jsx
+
+_ID = re.compile(r'/\d+/')
+
+
+class Stats:
+    """Latencies per endpoint, shared by all client threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.bytes = defaultdict(int)
+
+    def record(self, endpoint, seconds, ok, size):
+        with self.lock:
+            self.latencies[endpoint].append(seconds)
+            self.bytes[endpoint] += size
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def report(self, elapsed: float) -> dict:
+        out = {}
+        with self.lock:
+            for endpoint in sorted(self.latencies):
+                times = sorted(self.latencies[endpoint])
+                out[endpoint] = {
+                    'requests': len(times),
+                    'errors': self.errors[endpoint],
+                    'rps': len(times) / elapsed,
+                    'mb': self.bytes[endpoint] / 2 ** 20,
+                    **{f'p{p}_ms': percentile(times, p) * 1000 for p in PERCENTILES},
+                    'max_ms': times[-1] * 1000,
+                }
+        return out
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(p / 100 * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+class Client:
+    """One simulated operator: Basic auth, a new connection per request (as api_client.py does)."""
+
+    def __init__(self, base_url: str, username: str, password: str, stats: Stats, timeout: float):
+        self.base_url = base_url.rstrip('/')
+        token = base64.b64encode(f'{username}:{password}'.encode()).decode()
+        self.headers = {'Authorization': f'Basic {token}'}
+        self.stats = stats
+        self.timeout = timeout
+
+    def request(self, method, path, body=None, content_type=None, parse=False):
+        """Issue one timed request; return the decoded JSON body if `parse` and it succeeded."""
+        headers = dict(self.headers)
+        if content_type:
+            headers['Content-Type'] = content_type
+        endpoint = f'{method} {_ID.sub("/<id>/", path.split("?", 1)[0])}'
+        req = urllib.request.Request(self.base_url + path, data=body, headers=headers, method=method)
+        t0 = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as res:
+                payload = res.read()
+                status = res.status
+        except urllib.error.HTTPError as e:
+            payload = e.read()
+            status = e.code
+        except OSError:
+            payload, status = b'', 0  # refused, reset or timed out
+        self.stats.record(endpoint, time.perf_counter() - t0, 200 <= status < 300, len(payload))
+        if parse and 200 <= status < 300:
+            try:
+                return json.loads(payload)
+            except ValueError:
+                return None
+        return None
+
+    def get(self, path, parse=False):
+        return self.request('GET', path, parse=parse)
+
+    def upload(self, csv_path: Path, unique: bool):
+        content = csv_path.read_bytes()
+        name = csv_path.name
+        if unique:
+            # A distinct last row keeps the server's re-upload dedup from short-circuiting ingest.
+            tag = uuid.uuid4().hex[:12]
+            content = content.rstrip(b'\n') + f'\nLoad {tag},Pump,1,1,1\n'.encode()
+            name = f'{csv_path.stem}_{tag}.csv'
+        boundary = uuid.uuid4().hex
+        body = (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{name}"\r\n'
+            f'Content-Type: text/csv\r\n\r\n'
+        ).encode() + content + f'\r\n--{boundary}--\r\n'.encode()
+        return self.request('POST', '/upload/', body, f'multipart/form-data; boundary={boundary}', parse=True)
+
+
+def desktop_session(c: Client, opts, rng: random.Random):
+    c.get('/history/')  # login() checks credentials against /history/
+    history = c.get('/history/', parse=True) or []
+    for item in history[:opts.selections]:
+        c.get(f'/summary/{item["id"]}/')
+        c.get(f'/data/{item["id"]}/?layout=columns')
+    if rng.random() < opts.upload_ratio:
+        res = c.upload(rng.choice(opts.datasets), not opts.repeat_uploads)
+        if res:
+            c.get('/history/')
+            c.get(f'/summary/{res["id"]}/')
+            c.get(f'/data/{res["id"]}/?layout=columns')
+            history = [res] + history
+    if history and rng.random() < opts.pdf_ratio:
+        c.get(f'/report/{history[0]["id"]}/pdf/')
+
+
+def web_session(c: Client, opts, rng: random.Random):
+    history = c.get('/history/', parse=True) or []  # handleLogin
+    for item in history[:opts.selections]:
+        c.get(f'/summary/{item["id"]}/')
+        c.get(f'/charts/{item["id"]}/')
+        total = (item.get('summary') or {}).get('total_count') or 0
+        pages = max(min(opts.web_pages, -(-total // WEB_PAGE_ROWS)), 1)
+        for p in range(pages):
+            c.get(f'/data/{item["id"]}/?layout=columns&offset={p * WEB_PAGE_ROWS}&limit={WEB_PAGE_ROWS}')
+    if rng.random() < opts.upload_ratio:
+        res = c.upload(rng.choice(opts.datasets), not opts.repeat_uploads)
+        if res:
+            history = [res] + history
+            c.get(f'/summary/{res["id"]}/')
+            c.get(f'/charts/{res["id"]}/')
+    if history and rng.random() < opts.pdf_ratio:
+        c.get(f'/report/{history[0]["id"]}/pdf/')
+
+
+def _client_loop(n: int, opts, stats: Stats, deadline: float, sessions: list):
+    rng = random.Random(opts.seed + n)
+    c = Client(opts.base_url, opts.username, opts.password, stats, opts.timeout)
+    done = 0
+    while time.monotonic() < deadline and (not opts.sessions or done < opts.sessions):
+        session = web_session if rng.random() < opts.web_ratio else desktop_session
+        session(c, opts, rng)
+        done += 1
+    sessions[n] = done
+
+
+def run(opts) -> dict:
+    workdir = Path(tempfile.mkdtemp(prefix='equipment-load-'))
+    opts.datasets = [Path(generate_csv(workdir / f'equipment_{n}.csv', n, opts.types)) for n in opts.rows]
+
+    # Make sure there is something to browse before the clock starts.
+    seed = Client(opts.base_url, opts.username, opts.password, Stats(), opts.timeout)
+    if not seed.get('/history/', parse=True):
+        for path in opts.datasets:
+            seed.upload(path, unique=True)
+
+    stats = Stats()
+    sessions = [0] * opts.clients
+    deadline = time.monotonic() + opts.duration
+    threads = [threading.Thread(target=_client_loop, args=(n, opts, stats, deadline, sessions), daemon=True)
+               for n in range(opts.clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    endpoints = stats.report(elapsed)
+    all_times = sorted(t for times in stats.latencies.values() for t in times)
+    return {
+        'meta': {
+            'base_url': opts.base_url,
+            'clients': opts.clients,
+            'rows': opts.rows,
+            'web_ratio': opts.web_ratio,
+            'upload_ratio': opts.upload_ratio,
+            'pdf_ratio': opts.pdf_ratio,
+            'elapsed_s': elapsed,
+            'sessions': sum(sessions),
+        },
+        'total': {
+            'requests': len(all_times),
+            'errors': sum(stats.errors.values()),
+            'rps': len(all_times) / elapsed,
+            **{f'p{p}_ms': percentile(all_times, p) * 1000 for p in PERCENTILES},
+        },
+        'endpoints': endpoints,
+    }
+
+
+def print_report(report: dict):
+    m, t = report['meta'], report['total']
+    print(f'{m["clients"]} clients, {m["sessions"]} sessions in {m["elapsed_s"]:.1f}s: '
+          f'{t["requests"]} requests ({t["errors"]} errors), {t["rps"]:.1f} req/s, '
+          f'p50 {t["p50_ms"]:.0f} ms, p99 {t["p99_ms"]:.0f} ms')
+    print(f'{"endpoint":<28} {"reqs":>6} {"err":>5} {"req/s":>7} '
+          + ''.join(f'{"p" + str(p):>9}' for p in PERCENTILES) + f'{"max":>9}  (ms)')
+    for endpoint, r in report['endpoints'].items():
+        print(f'{endpoint:<28} {r["requests"]:>6} {r["errors"]:>5} {r["rps"]:>7.1f} '
+              + ''.join(f'{r[f"p{p}_ms"]:>9.1f}' for p in PERCENTILES) + f'{r["max_ms"]:>9.1f}')
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description='Replay client sessions against a running server.')
+    p.add_argument('--base-url', default='http://localhost:8000/api')
+    p.add_argument('--username', default='admin')
+    p.add_argument('--password', default='admin')
+    p.add_argument('--clients', type=int, default=4, help='concurrent simulated operators')
+    p.add_argument('--duration', type=float, default=30, help='seconds to run')
+    p.add_argument('--sessions', type=int, default=0, help='stop each client after this many sessions (0: no limit)')
+    p.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000], help='dataset sizes to upload')
+    p.add_argument('--types', type=int, default=6, help='distinct equipment types')
+    p.add_argument('--web-ratio', type=float, default=0.5, help='share of sessions from the web client')
+    p.add_argument('--upload-ratio', type=float, default=0.1, help='share of sessions that upload a CSV')
+    p.add_argument('--pdf-ratio', type=float, default=0.2, help='share of sessions that download a PDF')
+    p.add_argument('--selections', type=int, default=2, help='history entries opened per session')
+    p.add_argument('--web-pages', type=int, default=2, help='data pages a web session scrolls through')
+    p.add_argument('--repeat-uploads', action='store_true',
+                   help='upload the datasets unchanged, exercising re-upload dedup')
+    p.add_argument('--timeout', type=float, default=120)
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--output', help='write results JSON here')
+    opts = p.parse_args(argv)
+
+    report = run(opts)
+    print_report(report)
+    if opts.output:
+        Path(opts.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
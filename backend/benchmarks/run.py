@@ -0,0 +1,212 @@
+"""
+Benchmark the ingest, query and report paths against a throwaway database.
+
+Run from the backend directory:
+
+    python -m benchmarks.run --rows 1000 100000 --output bench.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --update-baseline
+
+Each case records wall time over `--repeat` runs, the peak of traced Python
+allocations for one extra run, and the process peak RSS (a high-water mark,
+so it only grows across cases).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from urllib.parse import quote
+
+from .synthetic import generate_csv
+
+
+def _setup_django(workdir: Path):
+    """Point Django at a scratch SQLite DB and media dir, then migrate."""
+    os.environ['DATABASE_URL'] = f'sqlite:///{workdir / "bench.sqlite3"}'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+    from django.conf import settings
+    from django.core.management import call_command
+    settings.MEDIA_ROOT = workdir / 'media'
+    call_command('migrate', verbosity=0)
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10)
+
+
+def measure(fn, repeat: int) -> dict:
+    fn()  # warm-up: imports, caches, first DB connection
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        fn()
+        _, alloc_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'wall_s': {
+            'min': min(times),
+            'median': statistics.median(times),
+            'mean': statistics.fmean(times),
+        },
+        'alloc_peak_mb': alloc_peak / 2 ** 20,
+        'rss_peak_mb': peak_rss_mb(),
+    }
+
+
+def _insert_readings(upload, rows, bulk_create=False):
+    """Insert `upload`'s readings and roll them back, so repeats start from the same table."""
+    from django.db import transaction
+    from equipment.models import EquipmentReading
+
+    with transaction.atomic():
+        if bulk_create:
+            EquipmentReading.objects.bulk_create(
+                (EquipmentReading(upload=upload, owner_id=upload.owner_id,
+                                  equipment_name=str(r.get('equipment name') or '')[:255],
+                                  recorded_at=upload.created_at, type=str(r.get('type') or '')[:255],
+                                  flowrate=r.get('flowrate'), pressure=r.get('pressure'),
+                                  temperature=r.get('temperature'))
+                 for r in rows),
+                batch_size=5000,
+            )
+        else:
+            EquipmentReading.record(upload, rows)
+        transaction.set_rollback(True)
+
+
+def _cases(csv_path: str, client, user) -> dict:
+    from equipment.analytics import ingest, parse_and_analyze
+    from equipment.column_store import ColumnFile, column_path, write_columns
+    from equipment.models import EquipmentReading, EquipmentUpload
+    from equipment.pdf_report import build_pdf
+
+    EquipmentUpload.objects.all().delete()
+    fields = ingest(csv_path)
+    name = os.path.basename(csv_path)
+    obj = EquipmentUpload.objects.create(owner=user, filename=name, **fields)
+    write_columns(obj.pk, fields['data'], fields['data_hash'])
+    EquipmentReading.record(obj, fields['data'])
+    unit = quote(fields['data'][0]['equipment name']) if fields['data'] else 'none'
+
+    def get(path):
+        r = client.get(path)
+        assert r.status_code == 200, (path, r.status_code)
+        return r.content
+
+    return {
+        'parse_and_analyze': lambda: parse_and_analyze(csv_path),
+        'upload_create': lambda: EquipmentUpload.objects.create(owner=user, filename=name, **fields),
+        'upload_read': lambda: EquipmentUpload.objects.get(pk=obj.pk).data,
+        'summary_view': lambda: get(f'/api/summary/{obj.pk}/'),
+        'data_view': lambda: get(f'/api/data/{obj.pk}/'),
+        'data_page_view': lambda: get(f'/api/data/{obj.pk}/?layout=columns&offset=0&limit=1000'),
+        'columns_write': lambda: write_columns(obj.pk, fields['data'], fields['data_hash']),
+        'columns_read': lambda: ColumnFile(column_path(obj.pk)).rows(),
+        'readings_record': lambda: _insert_readings(obj, fields['data']),
+        'readings_bulk_create': lambda: _insert_readings(obj, fields['data'], bulk_create=True),
+        'charts_view': lambda: get(f'/api/charts/{obj.pk}/'),
+        'history_view': lambda: get('/api/history/'),
+        'equipment_history_view': lambda: get(f'/api/equipment/history/?name={unit}'),
+        'build_pdf': lambda: build_pdf(obj),
+    }
+
+
+def run(row_counts, n_types: int, repeat: int, only=None, workdir: Path | None = None) -> dict:
+    workdir = Path(workdir or tempfile.mkdtemp(prefix='equipment-bench-'))
+    _setup_django(workdir)
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+
+    user, _ = get_user_model().objects.get_or_create(username='bench')
+    client = Client()
+    client.force_login(user)
+
+    results = {}
+    for n in row_counts:
+        csv_path = generate_csv(workdir / f'equipment_{n}.csv', n, n_types)
+        for name, fn in _cases(csv_path, client, user).items():
+            if only and name not in only:
+                continue
+            key = f'{name}[rows={n},types={n_types}]'
+            results[key] = measure(fn, repeat)
+            r = results[key]
+            print(f'{key:<50} {r["wall_s"]["median"] * 1000:10.2f} ms'
+                  f' {r["alloc_peak_mb"]:9.1f} MB alloc {r["rss_peak_mb"]:9.1f} MB rss')
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[dict]:
+    """Return cases whose median wall time grew by more than `threshold`."""
+    regressions = []
+    for key, r in results.items():
+        b = baseline.get('results', {}).get(key)
+        if not b or not b['wall_s']['median']:
+            continue
+        ratio = r['wall_s']['median'] / b['wall_s']['median']
+        if ratio > 1 + threshold:
+            regressions.append({
+                'case': key,
+                'baseline_s': b['wall_s']['median'],
+                'current_s': r['wall_s']['median'],
+                'ratio': round(ratio, 3),
+            })
+    return regressions
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description='Benchmark ingest, query and report paths.')
+    p.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000])
+    p.add_argument('--types', type=int, default=6, help='distinct equipment types')
+    p.add_argument('--repeat', type=int, default=5)
+    p.add_argument('--only', nargs='+', help='case names to run (default: all)')
+    p.add_argument('--output', help='write results JSON here')
+    p.add_argument('--baseline', help='baseline JSON to compare against')
+    p.add_argument('--update-baseline', action='store_true', help='overwrite --baseline with these results')
+    p.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown ratio (0.25 = 25%%)')
+    args = p.parse_args(argv)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'rows': args.rows,
+            'types': args.types,
+            'repeat': args.repeat,
+        },
+        'results': run(args.rows, args.types, args.repeat, args.only),
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+    if args.baseline and args.update_baseline:
+        Path(args.baseline).write_text(json.dumps(report, indent=2))
+        print(f'Baseline written to {args.baseline}')
+    elif args.baseline and os.path.exists(args.baseline):
+        regressions = compare(report['results'], json.loads(Path(args.baseline).read_text()), args.threshold)
+        for r in regressions:
+            print(f'REGRESSION {r["case"]}: {r["baseline_s"]:.4f}s -> {r["current_s"]:.4f}s (x{r["ratio"]})')
+        if regressions:
+            sys.exit(1)
+        print('No regressions against baseline.')
+
+
+if __name__ == '__main__':
+    main()
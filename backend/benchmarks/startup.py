@@ -0,0 +1,81 @@
+"""
+Measure cold-start import cost with `python -X importtime`.
+
+Run from the backend directory:
+
+    python -m benchmarks.startup                       # gunicorn worker boot + URLconf
+    python -m benchmarks.startup --target desktop      # desktop app up to the login dialog
+    python -m benchmarks.startup --output startup.json --top 15
+
+Each run is a fresh interpreter; the best of `--repeat` runs is reported.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DESKTOP_DIR = BACKEND_DIR.parent / 'frontend-desktop'
+
+TARGETS = {
+    # What a worker imports before serving its first request.
+    'backend': (BACKEND_DIR, (
+        "import os; os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings'); "
+        "import config.wsgi; from django.urls import get_resolver; get_resolver().url_patterns"
+    )),
+    # Everything main.py imports before LoginDialog is shown.
+    'desktop': (DESKTOP_DIR, 'import main'),
+}
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """Return (module, self_us, cumulative_us) for each `-X importtime` line."""
+    out = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        out.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    return out
+
+
+def measure(target: str) -> dict:
+    cwd, code = TARGETS[target]
+    env = {**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          cwd=cwd, env=env, capture_output=True, text=True)
+    if proc.returncode:
+        raise SystemExit(f'{target} import failed:\n{proc.stderr[-2000:]}')
+    entries = parse_importtime(proc.stderr)
+    # Top-level imports (no indentation) account for the whole run.
+    top = [(name.strip(), cum) for name, _, cum in entries if not name.startswith('  ')]
+    return {
+        'total_ms': sum(self_us for _, self_us, _ in entries) / 1000,
+        'modules': len(entries),
+        'heaviest_ms': {name: cum / 1000 for name, cum in sorted(top, key=lambda t: -t[1])},
+    }
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description='Measure cold-start import time.')
+    p.add_argument('--target', choices=sorted(TARGETS), default='backend')
+    p.add_argument('--repeat', type=int, default=3)
+    p.add_argument('--top', type=int, default=10, help='heaviest top-level imports to list')
+    p.add_argument('--output', help='write results JSON here')
+    args = p.parse_args(argv)
+
+    result = min((measure(args.target) for _ in range(args.repeat)), key=lambda r: r['total_ms'])
+    result['heaviest_ms'] = dict(list(result['heaviest_ms'].items())[:args.top])
+    print(f'{args.target}: {result["total_ms"]:.1f} ms in {result["modules"]} modules')
+    for name, ms in result['heaviest_ms'].items():
+        print(f'  {ms:9.1f} ms  {name}')
+    if args.output:
+        Path(args.output).write_text(json.dumps({args.target: result}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Generate synthetic equipment CSVs of arbitrary size for benchmarking."""
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+
+BASE_TYPES = ['Reactor', 'Distillation', 'Heat Exchanger', 'Pump', 'Compressor', 'Storage']
+
+# (mean, spread) per numeric column, roughly matching sample_equipment_data.csv
+RANGES = {
+    'flowrate': (220.0, 120.0),
+    'pressure': (3.0, 2.0),
+    'temperature': (70.0, 35.0),
+}
+
+
+def type_names(n_types: int) -> list[str]:
+    """Return `n_types` distinct equipment type names."""
+    names = BASE_TYPES[:n_types]
+    names += [f'Type-{i}' for i in range(len(names), n_types)]
+    return names
+
+
+def generate_csv(path, rows: int, n_types: int = 6, seed: int = 0) -> str:
+    """Write a CSV with `rows` rows spread over `n_types` types. Return the path."""
+    rng = random.Random(seed)
+    types = type_names(n_types)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        w = csv.writer(f)
+        w.writerow(['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature'])
+        for i in range(rows):
+            t = types[i % len(types)]
+            w.writerow([
+                f'{t}-{i}',
+                t,
+                *(round(rng.gauss(mean, spread / 3), 2) for mean, spread in RANGES.values()),
+            ])
+    return str(path)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument('path')
+    p.add_argument('--rows', type=int, default=10_000)
+    p.add_argument('--types', type=int, default=6)
+    p.add_argument('--seed', type=int, default=0)
+    args = p.parse_args(argv)
+    generate_csv(args.path, args.rows, args.types, args.seed)
+
+
+if __name__ == '__main__':
+    main()
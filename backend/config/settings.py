@@ -30,6 +30,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'equipment.metrics.MetricsMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -107,3 +108,44 @@ CORS_ALLOW_CREDENTIALS = True
 # Store uploaded CSVs (optional cleanup)
 MEDIA_ROOT = BASE_DIR / 'uploads'
 MEDIA_URL = '/uploads/'
+
+# Uploads larger than this (bytes) are rejected before the body is read
+EQUIPMENT_MAX_UPLOAD_SIZE = int(os.environ.get('EQUIPMENT_MAX_UPLOAD_SIZE', 50 * 1024 * 1024))
+
+# Per-type (min, max) limits flagged in the upload quality report. '*' applies to
+# every type; a type's own entry overrides it (None = use the '*' bound).
+EQUIPMENT_VALUE_LIMITS = {
+    '*': {
+        'flowrate': (0, None),
+        'pressure': (0, None),
+        'temperature': (-273.15, None),
+    },
+}
+
+# Uploads kept per user: newest `count`, trimmed further once they exceed
+# `bytes` in total (None = no size cap). Keys are usernames; '*' is the default.
+EQUIPMENT_RETENTION = {
+    '*': {
+        'count': int(os.environ.get('EQUIPMENT_RETENTION_COUNT', 5)),
+        'bytes': int(os.environ['EQUIPMENT_RETENTION_BYTES']) if os.environ.get('EQUIPMENT_RETENTION_BYTES') else None,
+    },
+}
+
+# PDF report detail level: 'summary', 'sample' (first N rows) or 'full'
+EQUIPMENT_REPORT_DETAIL = os.environ.get('EQUIPMENT_REPORT_DETAIL', 'full')
+EQUIPMENT_REPORT_SAMPLE_ROWS = 50
+# Processes used to render batch report archives
+EQUIPMENT_REPORT_WORKERS = int(os.environ.get('EQUIPMENT_REPORT_WORKERS', os.cpu_count() or 1))
+# ...and at most this many per /api/report/batch/ request, which shares the box with other requests
+EQUIPMENT_REPORT_REQUEST_WORKERS = min(int(os.environ.get('EQUIPMENT_REPORT_REQUEST_WORKERS', 2)),
+                                       EQUIPMENT_REPORT_WORKERS)
+
+# Seconds an aggregation query result stays cached (default cache backend)
+EQUIPMENT_QUERY_CACHE_TIMEOUT = 600
+
+# Per-route latency/DB metrics on /metrics and Server-Timing headers
+EQUIPMENT_METRICS_ENABLED = os.environ.get('EQUIPMENT_METRICS_ENABLED', 'False').lower() == 'true'
+
+# Staff usernames allowed to profile equipment API requests with ?profile=1 or an
+# X-Equipment-Profile header ('*' = any staff user); profiles go to MEDIA_ROOT/profiles
+EQUIPMENT_PROFILE_USERS = [u.strip() for u in os.environ.get('EQUIPMENT_PROFILE_USERS', '').split(',') if u.strip()]
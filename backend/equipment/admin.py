@@ -4,5 +4,6 @@ from .models import EquipmentUpload
 
 @admin.register(EquipmentUpload)
 class EquipmentUploadAdmin(admin.ModelAdmin):
-    list_display = ('id', 'filename', 'created_at')
-    readonly_fields = ('filename', 'created_at', 'summary', 'data')
+    list_display = ('id', 'owner', 'filename', 'size_bytes', 'created_at')
+    list_filter = ('owner',)
+    readonly_fields = ('filename', 'created_at', 'content_hash', 'data_hash', 'summary', 'data', 'charts', 'quality')
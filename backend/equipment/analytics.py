@@ -1,35 +1,78 @@
-"""Parse CSV and compute summary statistics using Pandas."""
+"""
+Parse CSV and compute summary statistics using Pandas.
+
+Pandas (and the numpy-based chart/quality helpers) are imported on first
+ingest rather than at module load, so importing the views stays cheap.
+"""
 from __future__ import annotations
 
-import io
+import hashlib
+import json
+import os
 from typing import Any
 
-import pandas as pd
-
+from .metrics import stage
 
 # Expected columns (case-insensitive match)
 COLUMNS = ['equipment name', 'type', 'flowrate', 'pressure', 'temperature']
+NUMERIC_COLUMNS = ['flowrate', 'pressure', 'temperature']
+
+
+def missing_columns(columns) -> list[str]:
+    """Return the required COLUMNS absent from a header row."""
+    present = {str(c).strip().lower() for c in columns}
+    return [c for c in COLUMNS if c not in present]
 
 
-def parse_and_analyze(csv_file) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+def data_hash(rows) -> str:
+    """SHA-256 of normalized rows, so CSVs differing only in layout hash alike."""
+    payload = json.dumps(rows, sort_keys=True, separators=(',', ':'), allow_nan=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def parse_and_analyze(source) -> tuple[list[dict[str, Any]], dict[str, Any]]:
     """
     Read CSV, validate columns, compute summary. Return (rows, summary).
     """
-    raw = csv_file.read()
-    if isinstance(raw, bytes):
-        raw = raw.decode('utf-8')
-    df = pd.read_csv(io.StringIO(raw))
+    result = ingest(source)
+    return result['data'], result['summary']
+
+
+def ingest(source) -> dict[str, Any]:
+    """
+    Parse a CSV and compute everything stored with an upload, keyed by
+    EquipmentUpload field: data (rows), data_hash, summary, charts and quality.
+    `source` is a path (memory-mapped by the parser) or a file object.
+    """
+    import pandas as pd
+
+    with stage('parse'):
+        if isinstance(source, (str, os.PathLike)):
+            df = pd.read_csv(source, encoding='utf-8', memory_map=True)
+        else:
+            df = pd.read_csv(source, encoding='utf-8')
+    with stage('analyze'):
+        return _analyze(df)
+
+
+def _analyze(df) -> dict[str, Any]:
+    import pandas as pd
+
+    from .charts import build_chart_series
+    from .quality import quality_report
 
     # Normalize column names
     df.columns = [c.strip().lower() for c in df.columns]
-    missing = [c for c in COLUMNS if c not in df.columns]
+    missing = missing_columns(df.columns)
     if missing:
         raise ValueError(f"Missing required columns: {missing}")
 
-    # Ensure numeric types
-    for col in ['flowrate', 'pressure', 'temperature']:
+    # Ensure numeric types; the quality report records what gets dropped
+    raw = df[NUMERIC_COLUMNS].copy()
+    for col in NUMERIC_COLUMNS:
         df[col] = pd.to_numeric(df[col], errors='coerce')
-    df = df.dropna(subset=['flowrate', 'pressure', 'temperature'])
+    quality = quality_report(raw, df)
+    df = df.dropna(subset=NUMERIC_COLUMNS)
 
     rows = df.to_dict('records')
     for r in rows:
@@ -45,11 +88,14 @@ def parse_and_analyze(csv_file) -> tuple[list[dict[str, Any]], dict[str, Any]]:
     type_dist = {str(k): int(v) for k, v in df['type'].value_counts().items()}
     summary = {
         'total_count': int(len(df)),
-        'averages': {
-            'flowrate': round(float(df['flowrate'].mean()), 4),
-            'pressure': round(float(df['pressure'].mean()), 4),
-            'temperature': round(float(df['temperature'].mean()), 4),
-        },
+        # None when every row was rejected: NaN is not valid JSON.
+        'averages': {m: round(float(df[m].mean()), 4) if len(df) else None for m in NUMERIC_COLUMNS},
         'type_distribution': type_dist,
     }
-    return rows, summary
+    return {
+        'data': rows,
+        'data_hash': data_hash(rows),
+        'summary': summary,
+        'charts': build_chart_series(df),
+        'quality': quality,
+    }
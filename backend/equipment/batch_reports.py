@@ -0,0 +1,90 @@
+"""Render reports for many uploads in parallel and bundle them into a zip archive."""
+import io
+import multiprocessing
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+
+from .models import EquipmentUpload
+from .pdf_report import build_pdf, cached_pdf
+from .storage import report_path
+
+
+def _init_worker():
+    # Spawned workers start from a fresh interpreter.
+    import django
+    django.setup()
+
+
+def _render(upload_id, detail):
+    return cached_pdf(EquipmentUpload.objects.get(pk=upload_id), detail)
+
+
+def iter_reports(uploads, detail=None, workers=None):
+    """
+    Yield (upload, pdf path) for each upload as its report becomes available:
+    cached reports first, then the rest as the process pool finishes them.
+    """
+    detail = detail or settings.EQUIPMENT_REPORT_DETAIL
+    workers = workers or settings.EQUIPMENT_REPORT_WORKERS
+    pending = []
+    for upload in uploads:
+        path = report_path(upload, detail)
+        if path.exists():
+            yield upload, str(path)
+        else:
+            pending.append(upload)
+    if workers <= 1 or len(pending) <= 1:
+        for upload in pending:
+            yield upload, build_pdf(upload, detail)
+        return
+
+    # Spawned, not forked: forking a serving worker mid-request would copy its
+    # threads' state and open sockets into every child.
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(pending)), initializer=_init_worker,
+                               mp_context=multiprocessing.get_context('spawn'))
+    try:
+        futures = {pool.submit(_render, u.pk, detail): u for u in pending}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+class _Sink(io.RawIOBase):
+    """Unseekable write target that hands back whatever was written since the last take()."""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.chunks.append(bytes(b))
+        return len(b)
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_zip(files):
+    """Yield a zip archive of (archive name, path) pairs piece by piece as they arrive."""
+    sink = _Sink()
+    # PDF streams are already compressed; storing avoids a second deflate pass.
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as zf:
+        for arcname, path in files:
+            zf.write(path, arcname)
+            yield sink.take()
+    yield sink.take()
+
+
+def report_archive(uploads, detail=None, workers=None):
+    """Stream a zip of the reports for `uploads`, named report_<id>_<filename>.pdf."""
+    return stream_zip(
+        (f'report_{u.id}_{u.filename}.pdf', path) for u, path in iter_reports(uploads, detail, workers)
+    )
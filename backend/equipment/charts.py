@@ -0,0 +1,61 @@
+"""Compact, chart-ready series precomputed from an upload's numeric columns."""
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+METRICS = ['flowrate', 'pressure', 'temperature']
+HIST_BINS = 20
+DENSITY_BINS = 20
+# Min/max downsampling keeps two points per bucket.
+SERIES_BUCKETS = 128
+
+
+def _round(values) -> list[float]:
+    return [round(float(v), 4) for v in values]
+
+
+def histogram(values: np.ndarray, bins: int = HIST_BINS) -> dict[str, list]:
+    counts, edges = np.histogram(values, bins=bins)
+    return {'edges': _round(edges), 'counts': counts.tolist()}
+
+
+def density(x: np.ndarray, y: np.ndarray, bins: int = DENSITY_BINS) -> dict[str, list]:
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    return {
+        'x_edges': _round(x_edges),
+        'y_edges': _round(y_edges),
+        'counts': counts.astype(int).tolist(),  # counts[i][j]: x bin i, y bin j
+    }
+
+
+def minmax_downsample(values: np.ndarray, buckets: int = SERIES_BUCKETS) -> dict[str, list]:
+    """
+    Reduce a series to at most 2 * `buckets` points, keeping each bucket's
+    minimum and maximum (in row order) so spikes survive the reduction.
+    """
+    n = len(values)
+    if n <= 2 * buckets:
+        return {'index': list(range(n)), 'values': _round(values)}
+    starts = np.linspace(0, n, buckets + 1, dtype=int).tolist()
+    index = []
+    for lo, hi in zip(starts[:-1], starts[1:]):
+        chunk = values[lo:hi]
+        a, b = lo + int(chunk.argmin()), lo + int(chunk.argmax())
+        index.extend(sorted({a, b}))
+    return {'index': index, 'values': _round(values[index])}
+
+
+def build_chart_series(columns) -> dict[str, Any]:
+    """
+    Build histograms, a pressure/temperature density and downsampled series
+    from a DataFrame (or any mapping of metric name to values).
+    """
+    cols = {m: np.asarray(columns[m], dtype=float) for m in METRICS}
+    return {
+        'histograms': {m: histogram(v) for m, v in cols.items()},
+        'density': {'x': 'pressure', 'y': 'temperature',
+                    **density(cols['pressure'], cols['temperature'])},
+        'series': {m: minmax_downsample(v) for m, v in cols.items()},
+    }
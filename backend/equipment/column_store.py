@@ -0,0 +1,226 @@
+"""
+Fixed-layout binary column files for upload rows, read through mmap.
+
+The rows stored as JSON on EquipmentUpload.data are also written to
+MEDIA_ROOT/columns/upload_<id>.cols. Readers (data pages, queries, chart
+backfill, reports) map that file and slice it instead of decoding the whole
+JSON field per request, and every worker shares the same pages of the OS
+page cache. The file is derived data: like a stored report it is rebuilt
+from the database row whenever it is missing, or when the data_hash in its
+header no longer matches the upload (e.g. a database restored without its
+media directory).
+
+Layout, little-endian, every section 8-byte aligned:
+
+    b'EQCOLS1\\0' | uint32 header length | header JSON | padding
+    numeric column: float64[rows]                        (NaN = missing)
+    text column:    int32 codes[rows]                    (-1 = missing)
+                    int64 offsets[categories + 1] | UTF-8 category bytes
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .storage import column_path
+
+MAGIC = b'EQCOLS1\0'
+# Decode every category up front when there are at most this many (types,
+# small vocabularies); otherwise decode just the ones a slice touches.
+EAGER_CATEGORIES = 4096
+
+
+def _pad(n: int) -> int:
+    return -n % 8
+
+
+def _is_number(v) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _encode(rows: list[dict[str, Any]], data_hash: str) -> bytes:
+    columns = list(rows[0]) if rows else []
+    n = len(rows)
+    specs, sections = [], []
+    for name in columns:
+        values = [r.get(name) for r in rows]
+        present = [v for v in values if v is not None]
+        if present and all(_is_number(v) for v in present):
+            arr = np.array([np.nan if v is None else v for v in values], dtype='<f8')
+            specs.append({'name': name, 'kind': 'number',
+                          'integer': all(isinstance(v, int) for v in present)})
+            sections.append([arr.tobytes()])
+        else:
+            index = {}
+            codes = np.fromiter(
+                (-1 if v is None else index.setdefault(str(v), len(index)) for v in values),
+                dtype='<i4', count=n)
+            encoded = [c.encode('utf-8') for c in index]
+            offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+            np.cumsum([len(b) for b in encoded], out=offsets[1:])
+            specs.append({'name': name, 'kind': 'text', 'categories': len(encoded)})
+            sections.append([codes.tobytes(), offsets.tobytes(), b''.join(encoded)])
+
+    # Offsets depend on the header length, which depends on the offsets'
+    # digits; lay out with placeholders until the length settles.
+    header_len = 0
+    while True:
+        pos = len(MAGIC) + 4 + header_len
+        pos += _pad(pos)
+        for spec, parts in zip(specs, sections):
+            spec['offsets'] = []
+            for part in parts:
+                spec['offsets'].append(pos)
+                pos += len(part) + _pad(len(part))
+        header = json.dumps({'rows': n, 'data_hash': data_hash, 'columns': specs},
+                            separators=(',', ':')).encode()
+        if len(header) == header_len:
+            break
+        header_len = len(header)
+
+    out = [MAGIC, struct.pack('<I', len(header)), header]
+    size = len(MAGIC) + 4 + len(header)
+    out.append(b'\0' * _pad(size))
+    for parts in sections:
+        for part in parts:
+            out.append(part)
+            out.append(b'\0' * _pad(len(part)))
+    return b''.join(out)
+
+
+def write_columns(upload_id: int, rows: list[dict[str, Any]], data_hash: str = '') -> Path:
+    """Write the column file for an upload; return its path."""
+    path = column_path(upload_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Temp file and rename, so concurrent readers never map a partial file.
+    fd, tmp = tempfile.mkstemp(suffix='.cols', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_encode(rows, data_hash))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+class ColumnFile:
+    """
+    Read-only view of a column file. Numeric columns are numpy arrays over
+    the mapping (no copy); text is decoded only for the rows asked for.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f'{path} is not an equipment column file')
+        (header_len,) = struct.unpack_from('<I', self._mm, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self._mm[start:start + header_len])
+        self._rows = header['rows']
+        self.data_hash = header.get('data_hash', '')
+        self._specs = {spec['name']: spec for spec in header['columns']}
+        self.columns = [spec['name'] for spec in header['columns']]
+        self._categories = {}
+
+    def __len__(self):
+        return self._rows
+
+    def is_numeric(self, name: str) -> bool:
+        return self._specs[name]['kind'] == 'number'
+
+    def numeric(self, name: str) -> np.ndarray:
+        """float64 values of a numeric column, NaN where missing (a view of the file)."""
+        spec = self._specs[name]
+        return np.frombuffer(self._mm, dtype='<f8', count=self._rows, offset=spec['offsets'][0])
+
+    def codes(self, name: str) -> np.ndarray:
+        """int32 category codes of a text column, -1 where missing (a view of the file)."""
+        spec = self._specs[name]
+        return np.frombuffer(self._mm, dtype='<i4', count=self._rows, offset=spec['offsets'][0])
+
+    def _category_offsets(self, name: str) -> np.ndarray:
+        spec = self._specs[name]
+        return np.frombuffer(self._mm, dtype='<i8', count=spec['categories'] + 1, offset=spec['offsets'][1])
+
+    def categories(self, name: str) -> list[str]:
+        """Every distinct value of a text column, indexed by code."""
+        if name not in self._categories:
+            base = self._specs[name]['offsets'][2]
+            bounds = self._category_offsets(name).tolist()
+            mm = self._mm
+            self._categories[name] = [mm[base + a:base + b].decode('utf-8') for a, b in zip(bounds, bounds[1:])]
+        return self._categories[name]
+
+    def column(self, name: str, start: int = 0, stop: int | None = None) -> list:
+        """JSON-ready values of rows [start, stop) of one column."""
+        if self.is_numeric(name):
+            values = self.numeric(name)[start:stop]
+            missing = np.isnan(values)
+            if self._specs[name]['integer']:
+                out = np.where(missing, 0, values).astype(np.int64).tolist()
+            else:
+                out = values.tolist()
+            if missing.any():
+                for i in np.flatnonzero(missing).tolist():
+                    out[i] = None
+            return out
+        codes = self.codes(name)[start:stop].tolist()
+        spec = self._specs[name]
+        if spec['categories'] <= EAGER_CATEGORIES or len(codes) >= spec['categories']:
+            cats = self.categories(name)
+            return [None if c < 0 else cats[c] for c in codes]
+        base = spec['offsets'][2]
+        bounds = self._category_offsets(name)
+        mm = self._mm
+        return [None if c < 0 else mm[base + int(bounds[c]):base + int(bounds[c + 1])].decode('utf-8')
+                for c in codes]
+
+    def rows(self, start: int = 0, stop: int | None = None) -> list[dict[str, Any]]:
+        """Rows [start, stop) as dicts, in the shape stored on EquipmentUpload.data."""
+        columns = self.columns
+        values = [self.column(name, start, stop) for name in columns]
+        return [dict(zip(columns, row)) for row in zip(*values)]
+
+    def row_view(self) -> 'RowView':
+        return RowView(self)
+
+
+class RowView:
+    """Sequence of row dicts over a ColumnFile; slicing decodes only that slice."""
+
+    def __init__(self, columns: ColumnFile):
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            rows = self.columns.rows(start, stop)
+            return rows[::step] if step != 1 else rows
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError(key)
+        return self.columns.rows(key, key + 1)[0]
+
+
+def cached_columns(upload) -> ColumnFile:
+    """Map the column file of `upload`, writing it from the stored rows on first use."""
+    path = column_path(upload.pk)
+    if path.exists():
+        columns = ColumnFile(path)
+        if not upload.data_hash or columns.data_hash == upload.data_hash:
+            return columns
+    write_columns(upload.pk, upload.data, upload.data_hash)
+    return ColumnFile(path)
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from equipment.batch_reports import report_archive
+from equipment.models import EquipmentUpload
+from equipment.pdf_report import DETAIL_LEVELS
+
+
+class Command(BaseCommand):
+    help = 'Render PDF reports for uploads in parallel and write them to a zip archive.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int, help='Upload ids (default: all retained uploads).')
+        parser.add_argument('--user', help='Only uploads owned by this username.')
+        parser.add_argument('--detail', choices=DETAIL_LEVELS, help='Report detail level.')
+        parser.add_argument('--workers', type=int, help='Worker processes (default: EQUIPMENT_REPORT_WORKERS).')
+        parser.add_argument('--output', default='reports.zip', help='Archive path.')
+
+    def handle(self, *args, **options):
+        qs = EquipmentUpload.objects.defer('data', 'charts', 'quality')
+        if options['ids']:
+            qs = qs.filter(pk__in=options['ids'])
+        if options['user']:
+            qs = qs.filter(owner__username=options['user'])
+        uploads = list(qs)
+        if not uploads:
+            raise CommandError('No matching uploads.')
+        with open(options['output'], 'wb') as f:
+            for chunk in report_archive(uploads, options['detail'], options['workers']):
+                f.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {len(uploads)} reports to {options["output"]}'))
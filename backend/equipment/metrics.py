@@ -0,0 +1,168 @@
+"""
+Request and stage instrumentation, exposed as Prometheus text on /metrics and
+as Server-Timing response headers.
+
+Enabled with EQUIPMENT_METRICS_ENABLED. When off, the middleware removes
+itself at startup and `stage()` returns a shared no-op context manager.
+Metrics live in process memory, so each gunicorn worker reports its own.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import Http404, HttpResponse
+
+# Histogram bucket upper bounds, in seconds.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_NOOP = nullcontext()
+_lock = threading.Lock()
+_requests = {}   # (route, method, status) -> Histogram
+_queries = {}    # route -> [count, seconds]
+_stages = {}     # stage name -> Histogram
+_timings = ContextVar('equipment_stage_timings', default=None)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'sum', 'count')
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.buckets[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _observe(registry, key, value):
+    with _lock:
+        hist = registry.get(key)
+        if hist is None:
+            hist = registry[key] = Histogram()
+        hist.observe(value)
+
+
+def stage(name):
+    """Time a named internal stage (parse, persist, render_pdf, ...)."""
+    if not settings.EQUIPMENT_METRICS_ENABLED:
+        return _NOOP
+    return _timed_stage(name)
+
+
+@contextmanager
+def _timed_stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _observe(_stages, name, elapsed)
+        timings = _timings.get()
+        if timings is not None:
+            timings.append((name, elapsed))
+
+
+class _QueryCounter:
+    """connection.execute_wrapper hook counting queries and their time."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+class MetricsMiddleware:
+    """Record per-route latency, DB usage and stage timings for each request."""
+
+    def __init__(self, get_response):
+        if not settings.EQUIPMENT_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = []
+        token = _timings.set(timings)
+        db = _QueryCounter()
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(db):
+                response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+        total = time.perf_counter() - start
+
+        match = request.resolver_match
+        route = match.route if match else 'unmatched'
+        _observe(_requests, (route, request.method, response.status_code), total)
+        with _lock:
+            q = _queries.setdefault(route, [0, 0.0])
+            q[0] += db.count
+            q[1] += db.seconds
+
+        entries = [f'{name};dur={secs * 1000:.1f}' for name, secs in timings]
+        entries.append(f'db;dur={db.seconds * 1000:.1f};desc="{db.count} queries"')
+        entries.append(f'total;dur={total * 1000:.1f}')
+        response['Server-Timing'] = ', '.join(entries)
+        return response
+
+
+def _labels(**labels):
+    def esc(v):
+        return str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ','.join(f'{k}="{esc(v)}"' for k, v in labels.items())
+
+
+def _histogram_lines(name, labels, hist):
+    lines = []
+    cumulative = 0
+    for bound, n in zip(BUCKETS + ('+Inf',), hist.buckets):
+        cumulative += n
+        lines.append(f'{name}_bucket{{{_labels(**labels, le=bound)}}} {cumulative}')
+    lines.append(f'{name}_sum{{{_labels(**labels)}}} {hist.sum}')
+    lines.append(f'{name}_count{{{_labels(**labels)}}} {hist.count}')
+    return lines
+
+
+def render_prometheus():
+    """Return all collected metrics in the Prometheus text exposition format."""
+    out = []
+    with _lock:
+        out.append('# HELP equipment_request_duration_seconds Request latency by route.')
+        out.append('# TYPE equipment_request_duration_seconds histogram')
+        for (route, method, status), hist in sorted(_requests.items()):
+            out += _histogram_lines('equipment_request_duration_seconds',
+                                    {'route': route, 'method': method, 'status': status}, hist)
+        out.append('# HELP equipment_db_queries_total Database queries by route.')
+        out.append('# TYPE equipment_db_queries_total counter')
+        for route, (count, _) in sorted(_queries.items()):
+            out.append(f'equipment_db_queries_total{{{_labels(route=route)}}} {count}')
+        out.append('# HELP equipment_db_query_seconds_total Time spent in database queries by route.')
+        out.append('# TYPE equipment_db_query_seconds_total counter')
+        for route, (_, seconds) in sorted(_queries.items()):
+            out.append(f'equipment_db_query_seconds_total{{{_labels(route=route)}}} {seconds}')
+        out.append('# HELP equipment_stage_duration_seconds Duration of internal processing stages.')
+        out.append('# TYPE equipment_stage_duration_seconds histogram')
+        for name, hist in sorted(_stages.items()):
+            out += _histogram_lines('equipment_stage_duration_seconds', {'stage': name}, hist)
+    return '\n'.join(out) + '\n'
+
+
+def metrics_view(request):
+    if not settings.EQUIPMENT_METRICS_ENABLED:
+        raise Http404
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
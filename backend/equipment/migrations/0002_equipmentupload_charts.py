@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipmentupload',
+            name='charts',
+            field=models.JSONField(default=dict),
+        ),
+    ]
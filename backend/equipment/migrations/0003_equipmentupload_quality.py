@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0002_equipmentupload_charts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipmentupload',
+            name='quality',
+            field=models.JSONField(default=dict),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0003_equipmentupload_quality'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipmentupload',
+            name='owner',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='equipment_uploads', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='equipmentupload',
+            name='size_bytes',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='equipmentupload',
+            index=models.Index(fields=['owner', '-created_at'], name='equipment_owner_created_idx'),
+        ),
+    ]
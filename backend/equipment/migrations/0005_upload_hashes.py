@@ -0,0 +1,43 @@
+import hashlib
+import json
+
+from django.db import migrations, models
+
+
+def backfill_data_hash(apps, schema_editor):
+    # Same normalization as analytics.data_hash, inlined so the migration
+    # keeps working if that helper changes.
+    EquipmentUpload = apps.get_model('equipment', 'EquipmentUpload')
+    for upload in EquipmentUpload.objects.only('id', 'data').iterator():
+        payload = json.dumps(upload.data, sort_keys=True, separators=(',', ':'))
+        upload.data_hash = hashlib.sha256(payload.encode()).hexdigest()
+        upload.save(update_fields=['data_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0004_owner_scoping'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipmentupload',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='equipmentupload',
+            name='data_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='equipmentupload',
+            index=models.Index(fields=['owner', 'content_hash'], name='equipment_owner_content_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipmentupload',
+            index=models.Index(fields=['owner', 'data_hash'], name='equipment_owner_data_idx'),
+        ),
+        migrations.RunPython(backfill_data_hash, migrations.RunPython.noop),
+    ]
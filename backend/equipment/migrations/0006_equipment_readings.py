@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_readings(apps, schema_editor):
+    EquipmentUpload = apps.get_model('equipment', 'EquipmentUpload')
+    EquipmentReading = apps.get_model('equipment', 'EquipmentReading')
+    for upload in EquipmentUpload.objects.only('id', 'owner_id', 'created_at', 'data').iterator():
+        EquipmentReading.objects.bulk_create(
+            (EquipmentReading(upload_id=upload.id, owner_id=upload.owner_id,
+                              equipment_name=str(r.get('equipment name') or '')[:255],
+                              recorded_at=upload.created_at, type=str(r.get('type') or '')[:255],
+                              flowrate=r.get('flowrate'), pressure=r.get('pressure'),
+                              temperature=r.get('temperature'))
+             for r in upload.data),
+            batch_size=5000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0005_upload_hashes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EquipmentReading',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('equipment_name', models.CharField(max_length=255)),
+                ('recorded_at', models.DateTimeField()),
+                ('type', models.CharField(blank=True, default='', max_length=255)),
+                ('flowrate', models.FloatField(null=True)),
+                ('pressure', models.FloatField(null=True)),
+                ('temperature', models.FloatField(null=True)),
+                ('owner', models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('upload', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='readings', to='equipment.equipmentupload')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', 'equipment_name', 'recorded_at'], name='equipment_reading_name_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_readings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def assign_unowned_uploads(apps, schema_editor):
+    """
+    Uploads stored before owner scoping (0004) have no owner: no history
+    shows them and no retention quota prunes them. Give them to the first
+    superuser (or, failing that, the first user); with no users at all they
+    cannot be reached, so they are deleted along with their files.
+    """
+    from equipment.storage import remove_columns, remove_reports
+
+    EquipmentUpload = apps.get_model('equipment', 'EquipmentUpload')
+    EquipmentReading = apps.get_model('equipment', 'EquipmentReading')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    unowned = EquipmentUpload.objects.filter(owner__isnull=True)
+    if not unowned.exists():
+        return
+    users = User.objects.order_by('pk')
+    owner = users.filter(is_superuser=True).first() or users.first()
+    if owner is None:
+        ids = list(unowned.values_list('pk', flat=True))
+        unowned.delete()
+        for pk in ids:
+            remove_reports(pk)
+            remove_columns(pk)
+        return
+    EquipmentReading.objects.filter(upload__owner__isnull=True).update(owner=owner)
+    unowned.update(owner=owner)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0006_equipment_readings'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(assign_unowned_uploads, migrations.RunPython.noop),
+    ]
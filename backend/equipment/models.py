@@ -1,19 +1,127 @@
-from django.db import models
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
 import json
 
+from .storage import remove_columns, remove_reports
+
+
+def retention_for(user) -> dict:
+    """Retention quota ({'count', 'bytes'}) for `user`, per EQUIPMENT_RETENTION."""
+    quotas = settings.EQUIPMENT_RETENTION
+    return {**quotas['*'], **quotas.get(getattr(user, 'username', None), {})}
+
 
 class EquipmentUpload(models.Model):
-    """Stores metadata and summary for each CSV upload. Keep last 5 only."""
+    """Stores metadata and summary for each CSV upload. Retention is per owner."""
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.CASCADE,
+                              related_name='equipment_uploads')
     filename = models.CharField(max_length=255)
+    size_bytes = models.PositiveBigIntegerField(default=0)  # size of the uploaded CSV
+    content_hash = models.CharField(max_length=64, blank=True, default='')  # SHA-256 of the raw CSV
+    data_hash = models.CharField(max_length=64, blank=True, default='')     # SHA-256 of the parsed rows
     created_at = models.DateTimeField(auto_now_add=True)
     summary = models.JSONField(default=dict)   # total_count, averages, type_distribution
     data = models.JSONField(default=list)     # list of row dicts for table/charts
+    charts = models.JSONField(default=dict)   # histograms, density, downsampled series
+    quality = models.JSONField(default=dict)  # rejected rows, duplicates, out-of-range values
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['owner', '-created_at'], name='equipment_owner_created_idx'),
+            models.Index(fields=['owner', 'content_hash'], name='equipment_owner_content_idx'),
+            models.Index(fields=['owner', 'data_hash'], name='equipment_owner_data_idx'),
+        ]
+
+    def reupload(self, filename, size_bytes):
+        """
+        Record a re-upload of the same rows: the stored rows and charts are
+        reused and this upload simply becomes the newest history entry. The
+        original content_hash is kept, so that file still skips parsing.
+        Stored reports name the file and upload time; they are dropped and
+        rebuilt on next use.
+        """
+        self.filename = filename
+        self.size_bytes = size_bytes
+        self.created_at = timezone.now()
+        self.save(update_fields=['filename', 'size_bytes', 'created_at'])
+        self.readings.update(recorded_at=self.created_at)
+        remove_reports(self.pk)
 
     @classmethod
-    def keep_last_n(cls, n=5):
+    def keep_last_n(cls, n=5, owner=None, max_bytes=None):
+        """
+        Delete all but the newest `n` uploads (of `owner`, if given), also
+        dropping older ones once their total size passes `max_bytes`.
+        The newest upload is always kept.
+        """
         qs = cls.objects.order_by('-created_at')
-        for obj in qs[n:]:
-            obj.delete()
+        if owner is not None:
+            qs = qs.filter(owner=owner)
+        drop = []
+        total = 0
+        for i, (pk, size) in enumerate(qs.values_list('pk', 'size_bytes')):
+            total += size
+            if i >= n or (max_bytes and i > 0 and total > max_bytes):
+                drop.append(pk)
+        cls.objects.filter(pk__in=drop).delete()
+
+
+@receiver(post_delete, sender=EquipmentUpload)
+def _remove_upload_files(sender, instance, **kwargs):
+    # A receiver rather than delete(), so queryset deletes, admin bulk
+    # actions and the owner cascade also drop the files.
+    remove_reports(instance.pk)
+    remove_columns(instance.pk)
+
+
+class EquipmentReading(models.Model):
+    """
+    One row of an upload, indexed by (owner, equipment name, upload time) so a
+    unit's history across uploads is a single index range scan. Written at
+    ingest; deleted with its upload.
+    """
+    upload = models.ForeignKey(EquipmentUpload, on_delete=models.CASCADE, related_name='readings')
+    # Indexed as the head of equipment_reading_name_idx.
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.CASCADE,
+                              related_name='+', db_index=False)
+    equipment_name = models.CharField(max_length=255)
+    recorded_at = models.DateTimeField()  # created_at of the upload
+    type = models.CharField(max_length=255, blank=True, default='')
+    flowrate = models.FloatField(null=True)
+    pressure = models.FloatField(null=True)
+    temperature = models.FloatField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'equipment_name', 'recorded_at'], name='equipment_reading_name_idx'),
+        ]
+
+    @classmethod
+    def record(cls, upload, rows):
+        """Store the rows of `upload` as readings."""
+        # Multi-row INSERTs of values prepared once. bulk_create builds and
+        # converts a model instance per row and, on SQLite, caps batches at
+        # 999 parameters: 6.7 s against 1.7 s for 100k rows (benchmarks.run
+        # readings_bulk_create / readings_record).
+        meta = cls._meta
+        qn = connection.ops.quote_name
+        fields = [meta.get_field(name) for name in (
+            'upload', 'owner', 'equipment_name', 'recorded_at', 'type', 'flowrate', 'pressure', 'temperature')]
+        recorded_at = meta.get_field('recorded_at').get_db_prep_save(upload.created_at, connection)
+        params = [
+            (upload.pk, upload.owner_id, str(r.get('equipment name') or '')[:255], recorded_at,
+             str(r.get('type') or '')[:255], r.get('flowrate'), r.get('pressure'), r.get('temperature'))
+            for r in rows
+        ]
+        insert = f'INSERT INTO {qn(meta.db_table)} ({", ".join(qn(f.column) for f in fields)}) VALUES '
+        placeholder = f'({", ".join(["%s"] * len(fields))})'
+        batch = max(min(connection.ops.bulk_batch_size(fields, params), 5000), 1)
+        with transaction.atomic(), connection.cursor() as cursor:
+            for start in range(0, len(params), batch):
+                chunk = params[start:start + batch]
+                cursor.execute(insert + ', '.join([placeholder] * len(chunk)),
+                               [v for row in chunk for v in row])
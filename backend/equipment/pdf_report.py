@@ -1,21 +1,185 @@
 """Generate PDF report for an equipment upload."""
 import os
-from io import BytesIO
-from pathlib import Path
+import tempfile
 
+from reportlab import rl_config
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.shapes import Drawing, String
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import Flowable, SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.enums import TA_CENTER
+from django.conf import settings
 
+from .column_store import cached_columns
 from .models import EquipmentUpload
+from .storage import report_path
 
+# Reports are served as binary files; ASCII85-encoding the compressed page
+# streams only adds a quarter to their size and to the build time.
+rl_config.useA85 = 0
 
-def build_pdf(upload: EquipmentUpload) -> str:
-    buf = BytesIO()
-    doc = SimpleDocTemplate(buf, pagesize=A4, rightMargin=inch, leftMargin=inch,
+# summary: text and charts only; sample: first EQUIPMENT_REPORT_SAMPLE_ROWS rows; full: every row
+DETAIL_LEVELS = ('summary', 'sample', 'full')
+
+ROW_HEIGHT = 12
+HEADER_HEIGHT = 16
+FONT_SIZE = 8
+# Monospaced glyph width: rows are laid out in character columns.
+CHAR_WIDTH = FONT_SIZE * 0.6
+# Relative column widths; unknown columns get 1.
+COLUMN_WEIGHTS = {'equipment name': 2.2, 'type': 1.6}
+# Type distribution chart shows at most this many bars.
+MAX_CHART_TYPES = 20
+
+
+class RowBlock(Flowable):
+    """
+    Data table drawn straight onto the canvas, one Courier text line per row.
+
+    Layout is arithmetic, and `split` hands the rest of the rows on to a new
+    block, so the story holds a single flowable however many rows there are
+    and every page costs the same to lay out and draw.
+    """
+
+    def __init__(self, rows, columns, width, start=0, end=None):
+        super().__init__()
+        self.rows = rows
+        self.columns = columns
+        self.table_width = width
+        self.start = start
+        self.end = len(rows) if end is None else end
+        # Characters per column, leaving one blank character either side.
+        weights = [COLUMN_WEIGHTS.get(c, 1) for c in columns]
+        usable = int(width / CHAR_WIDTH) - 2 * len(columns)
+        self.chars = [max(int(usable * w / sum(weights)), 3) for w in weights]
+        first = rows[0] if rows else {}
+        self.numeric = [isinstance(first.get(c), (int, float)) for c in columns]
+        self.xs = [0]
+        for chars in self.chars:
+            self.xs.append(self.xs[-1] + (chars + 2) * CHAR_WIDTH)
+
+    def wrap(self, avail_width, avail_height):
+        self.width = self.xs[-1]
+        self.height = HEADER_HEIGHT + ROW_HEIGHT * (self.end - self.start)
+        return self.width, self.height
+
+    def split(self, avail_width, avail_height):
+        fit = int((avail_height - HEADER_HEIGHT) // ROW_HEIGHT)
+        if fit <= 0 or fit >= self.end - self.start:
+            return []
+        mid = self.start + fit
+        return [
+            RowBlock(self.rows, self.columns, self.table_width, self.start, mid),
+            RowBlock(self.rows, self.columns, self.table_width, mid, self.end),
+        ]
+
+    def _line(self, values, align=None):
+        parts = []
+        for v, n, right in zip(values, self.chars, self.numeric):
+            text = '' if v is None else str(v)
+            if len(text) > n:
+                text = text[:n - 1] + '~'
+            if align == 'center':
+                parts.append(text.center(n))
+            else:
+                parts.append(text.rjust(n) if right else text.ljust(n))
+        return ' ' + '  '.join(parts)
+
+    def draw(self):
+        c = self.canv
+        n = self.end - self.start
+        body = ROW_HEIGHT * n
+        c.setFillColor(colors.beige)
+        c.rect(0, 0, self.width, body, stroke=0, fill=1)
+        c.setFillColor(colors.grey)
+        c.rect(0, body, self.width, HEADER_HEIGHT, stroke=0, fill=1)
+
+        c.setStrokeColor(colors.grey)
+        c.setLineWidth(0.5)
+        c.lines([(x, 0, x, self.height) for x in self.xs]
+                + [(0, y * ROW_HEIGHT, self.width, y * ROW_HEIGHT) for y in range(n + 1)]
+                + [(0, self.height, self.width, self.height)])
+
+        header = c.beginText(0, body + 5)
+        header.setFont('Courier-Bold', FONT_SIZE)
+        header.setFillColor(colors.whitesmoke)
+        header.textLine(self._line([col.replace('_', ' ').title() for col in self.columns], 'center'))
+        c.drawText(header)
+
+        text = c.beginText(0, body - ROW_HEIGHT + 3)
+        text.setFont('Courier', FONT_SIZE, leading=ROW_HEIGHT)
+        text.setFillColor(colors.black)
+        columns = self.columns
+        for r in self.rows[self.start:self.end]:
+            text.textLine(self._line([r.get(col) for col in columns]))
+        c.drawText(text)
+
+
+def _bar_chart(title, labels, values, width, bar_colors=None):
+    d = Drawing(width, 200)
+    d.add(String(width / 2, 186, title, textAnchor='middle', fontName='Helvetica-Bold', fontSize=10))
+    chart = VerticalBarChart()
+    chart.x, chart.y = 40, 45
+    chart.width, chart.height = width - 60, 125
+    chart.data = [list(values)]
+    chart.categoryAxis.categoryNames = [str(l) for l in labels]
+    chart.categoryAxis.labels.fontName = 'Helvetica'
+    chart.categoryAxis.labels.fontSize = 7
+    if len(labels) > 6:
+        chart.categoryAxis.labels.angle = 30
+        chart.categoryAxis.labels.boxAnchor = 'ne'
+    chart.valueAxis.valueMin = min(0, *values) if values else 0
+    chart.valueAxis.labels.fontName = 'Helvetica'
+    chart.valueAxis.labels.fontSize = 7
+    chart.bars[0].fillColor = colors.HexColor('#58a6ff')
+    for i, color in enumerate(bar_colors or []):
+        chart.bars[(0, i)].fillColor = colors.HexColor(color)
+    d.add(chart)
+    return d
+
+
+def _charts(summary, width):
+    dist = sorted(summary.get('type_distribution', {}).items(), key=lambda kv: -kv[1])[:MAX_CHART_TYPES]
+    avg = summary.get('averages', {})
+    flowables = []
+    if dist:
+        flowables.append(_bar_chart('Equipment type distribution',
+                                    [k for k, _ in dist], [v for _, v in dist], width))
+    if avg:
+        flowables.append(_bar_chart(
+            'Averages',
+            ['Flowrate', 'Pressure', 'Temperature'],
+            [avg.get('flowrate') or 0, avg.get('pressure') or 0, avg.get('temperature') or 0],
+            width,
+            bar_colors=['#3fb950', '#d29922', '#f85149'],
+        ))
+    return flowables
+
+
+def cached_pdf(upload: EquipmentUpload, detail: str = None) -> str:
+    """Return the stored report for `upload`, building it on first use."""
+    detail = detail or settings.EQUIPMENT_REPORT_DETAIL
+    path = report_path(upload, detail)
+    if path.exists():
+        return str(path)
+    return build_pdf(upload, detail)
+
+
+def build_pdf(upload: EquipmentUpload, detail: str = None) -> str:
+    """Render the report for `upload` at the given detail level; return the file path."""
+    detail = detail or settings.EQUIPMENT_REPORT_DETAIL
+    if detail not in DETAIL_LEVELS:
+        raise ValueError(f'Unknown detail level {detail!r}; expected one of {DETAIL_LEVELS}')
+
+    path = report_path(upload, detail)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Build into a temp file and rename, so readers never see a partial PDF.
+    fd, tmp = tempfile.mkstemp(suffix='.pdf', dir=path.parent)
+    os.close(fd)
+    doc = SimpleDocTemplate(tmp, pagesize=A4, rightMargin=inch, leftMargin=inch,
                             topMargin=inch, bottomMargin=inch)
     styles = getSampleStyleSheet()
     title_style = ParagraphStyle('Title', parent=styles['Heading1'], alignment=TA_CENTER)
@@ -40,39 +204,27 @@ def build_pdf(upload: EquipmentUpload) -> str:
     for k, v in dist.items():
         story.append(Paragraph(f'  • {k}: {v}', styles['Normal']))
     story.append(Spacer(1, 0.3 * inch))
+    story.extend(_charts(s, doc.width))
+
+    if detail != 'summary':
+        story.append(Paragraph('<b>Data</b>', styles['Heading2']))
+        # Slices of the memory-mapped column file; RowBlock decodes a page at a time.
+        rows = cached_columns(upload).row_view()
+        total = len(rows)
+        if detail == 'sample':
+            rows = rows[:settings.EQUIPMENT_REPORT_SAMPLE_ROWS]
+        if not rows:
+            story.append(Paragraph('No data.', styles['Normal']))
+        else:
+            story.append(RowBlock(rows, list(rows[0].keys()), doc.width))
+            if total > len(rows):
+                story.append(Spacer(1, 0.2 * inch))
+                story.append(Paragraph(f'... and {total - len(rows)} more rows.', styles['Normal']))
 
-    story.append(Paragraph('<b>Data</b>', styles['Heading2']))
-    rows = upload.data[:50]  # cap for PDF
-    if not rows:
-        story.append(Paragraph('No data.', styles['Normal']))
-    else:
-        headers = list(rows[0].keys())
-        table_data = [[h.replace('_', ' ').title() for h in headers]]
-        for r in rows:
-            table_data.append([str(r.get(h, '')) for h in headers])
-        t = Table(table_data, repeatRows=1)
-        t.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ]))
-        story.append(t)
-        if len(upload.data) > 50:
-            story.append(Spacer(1, 0.2 * inch))
-            story.append(Paragraph(f'... and {len(upload.data) - 50} more rows.', styles['Normal']))
-
-    doc.build(story)
-    buf.seek(0)
-    media = Path(settings.MEDIA_ROOT)
-    media.mkdir(parents=True, exist_ok=True)
-    out_dir = media / 'reports'
-    out_dir.mkdir(parents=True, exist_ok=True)
-    path = out_dir / f'report_{upload.id}.pdf'
-    with open(path, 'wb') as f:
-        f.write(buf.read())
+    try:
+        doc.build(story)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
     return str(path)
@@ -0,0 +1,104 @@
+"""
+Opt-in cProfile runs of single equipment API requests.
+
+A staff user listed in EQUIPMENT_PROFILE_USERS ('*' = any staff user) adds
+?profile=1 or an `X-Equipment-Profile: 1` header to a request. Everything
+from after authentication to the rendered response body runs under cProfile:
+for an upload that is parsing, analysis, the ORM insert and pruning; for a
+report, building the PDF. The stats are written to MEDIA_ROOT/profiles and
+named in the `X-Equipment-Profile` response header; with the value `inline`
+the response body is replaced by the top of the report as text.
+
+Read a saved profile with `python -m pstats <file>` or any pstats viewer.
+"""
+import cProfile
+import io
+import os
+import pstats
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.template.response import SimpleTemplateResponse
+from rest_framework.views import APIView
+
+PARAM = 'profile'
+HEADER = 'HTTP_X_EQUIPMENT_PROFILE'
+MODES = ('1', 'true', 'inline')
+# Functions listed in ?profile=inline output.
+INLINE_LIMIT = 40
+
+
+def requested_mode(request):
+    """'save' or 'inline' if the request asks to be profiled, else None."""
+    value = (request.query_params.get(PARAM) or request.META.get(HEADER) or '').lower()
+    if value not in MODES:
+        return None
+    return 'inline' if value == 'inline' else 'save'
+
+
+def may_profile(user) -> bool:
+    allowed = settings.EQUIPMENT_PROFILE_USERS
+    if not allowed or not getattr(user, 'is_staff', False):
+        return False
+    return '*' in allowed or user.get_username() in allowed
+
+
+def save_profile(profiler, request, view) -> Path:
+    directory = Path(settings.MEDIA_ROOT) / 'profiles'
+    directory.mkdir(parents=True, exist_ok=True)
+    now = time.time()
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(now)) + f'{now % 1:.3f}'[1:]
+    path = directory / f'{stamp}-{type(view).__name__}-{request.user.get_username()}-{os.getpid()}.prof'
+    profiler.dump_stats(path)
+    return path
+
+
+def report_text(profiler, limit=INLINE_LIMIT) -> str:
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+    return out.getvalue()
+
+
+class ProfiledAPIView(APIView):
+    """APIView that runs under cProfile when an allowed staff user asks for it."""
+
+    _profiler = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # After authentication, so Basic-auth users are known; before the handler.
+        mode = requested_mode(request)
+        if mode and may_profile(request.user):
+            self._profile_mode = mode
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            # finalize_response is skipped when handle_exception re-raises;
+            # never leave the profiler installed on this thread.
+            if self._profiler is not None:
+                self._profiler.disable()
+                self._profiler = None
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        profiler = self._profiler
+        if profiler is None:
+            return response
+        try:
+            # Include serializing the body, often the bulk of a large response.
+            if isinstance(response, SimpleTemplateResponse):
+                response.render()
+        finally:
+            profiler.disable()
+            self._profiler = None
+        path = save_profile(profiler, request, self)
+        if self._profile_mode == 'inline':
+            response = HttpResponse(report_text(profiler), content_type='text/plain; charset=utf-8')
+        response['X-Equipment-Profile'] = path.name
+        return response
@@ -0,0 +1,81 @@
+"""Data quality report built alongside parsing, so dropped rows are accounted for."""
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from .charts import METRICS
+
+# Line numbers listed per issue; counts are always complete.
+SAMPLE_SIZE = 10
+
+
+def _lines(mask: pd.Series) -> list[int]:
+    # Index 0 is the first record, on line 2 after the header (assumes no
+    # blank lines or multi-line quoted fields before it).
+    return [int(i) + 2 for i in mask.index[mask.to_numpy()][:SAMPLE_SIZE]]
+
+
+def _issue(mask: pd.Series) -> dict[str, Any]:
+    return {'count': int(mask.sum()), 'sample_lines': _lines(mask)}
+
+
+def _bounds(types: pd.Series, metric: str, limits: dict) -> tuple[np.ndarray, np.ndarray]:
+    """Per-row (low, high) limits for `metric`, type-specific limits overriding '*'."""
+    default_lo, default_hi = limits.get('*', {}).get(metric, (None, None))
+    lo_by_type = {t: v[metric][0] for t, v in limits.items() if t != '*' and metric in v}
+    hi_by_type = {t: v[metric][1] for t, v in limits.items() if t != '*' and metric in v}
+    lo = types.map(lo_by_type).astype(float).fillna(-np.inf if default_lo is None else default_lo)
+    hi = types.map(hi_by_type).astype(float).fillna(np.inf if default_hi is None else default_hi)
+    return lo.to_numpy(), hi.to_numpy()
+
+
+def quality_report(raw: pd.DataFrame, coerced: pd.DataFrame, limits: dict | None = None) -> dict[str, Any]:
+    """
+    Summarize problems in an upload. `raw` holds the metric columns as read;
+    `coerced` is the full frame after to_numeric, before invalid rows are dropped.
+    """
+    if limits is None:
+        limits = settings.EQUIPMENT_VALUE_LIMITS
+
+    rejected = {}
+    bad = pd.Series(False, index=coerced.index)
+    for m in METRICS:
+        missing = raw[m].isna()
+        invalid = coerced[m].isna() & ~missing
+        bad |= missing | invalid
+        if missing.any():
+            rejected[f'missing:{m}'] = _issue(missing)
+        if invalid.any():
+            rejected[f'non_numeric:{m}'] = _issue(invalid)
+
+    ok = coerced[~bad]
+    types = ok['type']
+
+    out_of_range = {}
+    for m in METRICS:
+        lo, hi = _bounds(types, m, limits)
+        values = ok[m].to_numpy(dtype=float)
+        mask = pd.Series((values < lo) | (values > hi), index=ok.index)
+        if mask.any():
+            out_of_range[m] = _issue(mask)
+
+    names = ok['equipment name']
+    counts = names[names.duplicated(keep=False)].value_counts()
+    return {
+        'input_rows': int(len(coerced)),
+        'accepted_rows': int(len(ok)),
+        'rejected_rows': int(bad.sum()),
+        'rejected': rejected,
+        'duplicate_names': {
+            'count': int(len(counts)),
+            'rows': int(counts.sum()),
+            'sample': [{'name': str(k), 'count': int(v)} for k, v in counts.head(SAMPLE_SIZE).items()],
+        },
+        'out_of_range': out_of_range,
+        'missing_type': _issue(types.isna()),
+        'type_cardinality': int(types.nunique()),
+    }
@@ -0,0 +1,132 @@
+"""
+Declarative filter/group/aggregate queries over the rows of stored uploads.
+
+A query is the validated QuerySerializer data. Results are cached keyed on
+the query and the ids of the uploads it ran over; uploads never change after
+ingest, so the ids identify the data exactly.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .analytics import COLUMNS, NUMERIC_COLUMNS
+
+GROUP_COLUMNS = {'type': 'type', 'equipment': 'equipment name', 'upload': 'upload'}
+DEFAULT_AGGREGATIONS = ['count', 'mean', 'min', 'max']
+
+
+def cache_key(spec: dict, upload_ids) -> str:
+    payload = json.dumps({'q': spec, 'uploads': sorted(upload_ids)}, sort_keys=True, default=str)
+    return 'equipment-query:' + hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _number(v):
+    v = float(v)
+    return None if math.isnan(v) else round(v, 4)
+
+
+def _key(v):
+    if v is None or (isinstance(v, float) and math.isnan(v)):
+        return None
+    return v.item() if hasattr(v, 'item') else v
+
+
+def _frame(uploads):
+    import numpy as np
+    import pandas as pd
+
+    from .column_store import cached_columns
+
+    frames = []
+    for u in uploads:
+        store = cached_columns(u)
+        cols = {}
+        for c in COLUMNS:
+            if c not in store.columns:
+                # Uploads with no accepted rows have no columns; keep metrics float.
+                cols[c] = np.full(len(store), np.nan if c in NUMERIC_COLUMNS else None,
+                                  dtype=float if c in NUMERIC_COLUMNS else object)
+            elif store.is_numeric(c):
+                cols[c] = store.numeric(c)
+            else:
+                # Code -1 (missing) picks the trailing None.
+                cats = np.array(store.categories(c) + [None], dtype=object)
+                cols[c] = cats[store.codes(c)]
+        df = pd.DataFrame(cols, columns=COLUMNS)
+        df['upload'] = u.id
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame({c: pd.Series(dtype=float if c in NUMERIC_COLUMNS else object)
+                             for c in COLUMNS + ['upload']})
+    return pd.concat(frames, ignore_index=True)
+
+
+def run_query(uploads, spec: dict) -> dict[str, Any]:
+    """Filter, group and aggregate the rows of `uploads` as described by `spec`."""
+    import numpy as np
+
+    df = _frame(uploads)
+    mask = np.ones(len(df), dtype=bool)
+    if spec.get('type'):
+        mask &= df['type'].isin(spec['type']).to_numpy()
+    for col, bounds in (spec.get('where') or {}).items():
+        values = df[col].to_numpy(dtype=float)
+        if 'gt' in bounds:
+            mask &= values > bounds['gt']
+        if 'gte' in bounds:
+            mask &= values >= bounds['gte']
+        if 'lt' in bounds:
+            mask &= values < bounds['lt']
+        if 'lte' in bounds:
+            mask &= values <= bounds['lte']
+    df = df[mask]
+
+    metrics = spec.get('metrics') or NUMERIC_COLUMNS
+    aggregations = spec.get('aggregations') or DEFAULT_AGGREGATIONS
+    group_by = spec.get('group_by')
+    if group_by:
+        grouped = df.groupby(GROUP_COLUMNS[group_by], sort=True, dropna=False)
+    else:
+        grouped = df.assign(_all=0).groupby('_all')
+
+    numeric = grouped[metrics]
+    computed = {}  # aggregation -> metric -> one value per group, in group order
+    for agg in aggregations:
+        if agg == 'count':
+            continue
+        if agg.startswith('p'):
+            table = numeric.quantile(float(agg[1:]) / 100)
+        else:
+            table = getattr(numeric, agg)()
+        computed[agg] = {m: table[m].to_numpy() for m in metrics}
+
+    sizes = grouped.size()
+    groups = []
+    for i, (key, size) in enumerate(sizes.items()):
+        g = {'key': _key(key) if group_by else None, 'count': int(size)}
+        for m in metrics:
+            g[m] = {agg: _number(cols[m][i]) for agg, cols in computed.items()}
+        groups.append(g)
+    return {
+        'uploads': [u.id for u in uploads],
+        'group_by': group_by,
+        'rows': int(len(df)),
+        'groups': groups,
+    }
+
+
+def cached_query(uploads_qs, spec: dict) -> dict[str, Any]:
+    """Run `spec` over the uploads in `uploads_qs`, reusing a cached result if any."""
+    ids = list(uploads_qs.values_list('pk', flat=True))
+    key = cache_key(spec, ids)
+    result = cache.get(key)
+    if result is None:
+        result = run_query(list(uploads_qs.only('id', 'data_hash')), spec)
+        cache.set(key, result, settings.EQUIPMENT_QUERY_CACHE_TIMEOUT)
+    return result
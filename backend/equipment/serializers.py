@@ -1,5 +1,41 @@
 from rest_framework import serializers
 
+from .analytics import NUMERIC_COLUMNS
+
+# count, mean, median, min, max, sum, std, or a percentile such as p95 / p99.9
+AGGREGATION_PATTERN = r'^(count|mean|median|min|max|sum|std|p(100|\d{1,2})(\.\d+)?)$'
+
 
 class UploadSerializer(serializers.Serializer):
     file = serializers.FileField(help_text='CSV file with Equipment Name, Type, Flowrate, Pressure, Temperature')
+
+
+class RangeSerializer(serializers.Serializer):
+    gt = serializers.FloatField(required=False)
+    gte = serializers.FloatField(required=False)
+    lt = serializers.FloatField(required=False)
+    lte = serializers.FloatField(required=False)
+
+
+class QuerySerializer(serializers.Serializer):
+    uploads = serializers.ListField(child=serializers.IntegerField(), required=False,
+                                    help_text='Upload ids (default: all of your retained uploads)')
+    last = serializers.IntegerField(min_value=1, required=False, help_text='Only the newest N of those uploads')
+    type = serializers.ListField(child=serializers.CharField(), required=False, help_text='Keep these types only')
+    where = serializers.DictField(child=RangeSerializer(), required=False,
+                                  help_text='Numeric ranges, e.g. {"pressure": {"gt": 2}}')
+    group_by = serializers.ChoiceField(choices=['type', 'equipment', 'upload'], required=False, allow_null=True)
+    metrics = serializers.ListField(child=serializers.ChoiceField(choices=NUMERIC_COLUMNS), required=False)
+    aggregations = serializers.ListField(child=serializers.RegexField(AGGREGATION_PATTERN), required=False,
+                                         help_text='count, mean, median, min, max, sum, std, pNN')
+
+    def validate_where(self, value):
+        unknown = sorted(set(value) - set(NUMERIC_COLUMNS))
+        if unknown:
+            raise serializers.ValidationError(f'Unknown columns: {unknown}')
+        return value
+
+
+class EquipmentHistorySerializer(serializers.Serializer):
+    name = serializers.ListField(child=serializers.CharField(max_length=255), min_length=1, max_length=50,
+                                 help_text='Equipment names; repeat ?name= for several')
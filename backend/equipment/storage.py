@@ -0,0 +1,27 @@
+"""
+Where the files derived from an upload live under MEDIA_ROOT.
+
+Kept free of numpy and ReportLab so deleting or re-uploading never imports
+them; column_store and pdf_report build on these paths.
+"""
+from pathlib import Path
+
+from django.conf import settings
+
+
+def column_path(upload_id: int) -> Path:
+    return Path(settings.MEDIA_ROOT) / 'columns' / f'upload_{upload_id}.cols'
+
+
+def report_path(upload, detail: str) -> Path:
+    return Path(settings.MEDIA_ROOT) / 'reports' / f'report_{upload.id}_{detail}.pdf'
+
+
+def remove_columns(upload_id: int) -> None:
+    column_path(upload_id).unlink(missing_ok=True)
+
+
+def remove_reports(upload_id: int) -> None:
+    """Delete every stored report of an upload."""
+    for path in (Path(settings.MEDIA_ROOT) / 'reports').glob(f'report_{upload_id}_*.pdf'):
+        path.unlink(missing_ok=True)
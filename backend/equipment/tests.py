@@ -0,0 +1,126 @@
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .column_store import EAGER_CATEGORIES, ColumnFile, cached_columns, write_columns
+from .models import EquipmentUpload
+from .upload_handlers import MAX_HEADER_BYTES
+
+HEADER = 'Equipment Name,Type,Flowrate,Pressure,Temperature\n'
+
+
+def _csv(name, body):
+    return SimpleUploadedFile(name, (HEADER + body).encode(), content_type='text/csv')
+
+
+class MediaTestCase(TestCase):
+    """TestCase with a throwaway MEDIA_ROOT and a logged-in user."""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+        cache.clear()
+        self.user = User.objects.create_user('operator', password='secret')
+        self.client.force_login(self.user)
+
+    def upload(self, name, body):
+        res = self.client.post('/api/upload/', {'file': _csv(name, body)})
+        self.assertIn(res.status_code, (200, 201), res.content)
+        return res.json()['id']
+
+
+class UploadTests(MediaTestCase):
+    def test_byte_order_mark(self):
+        f = SimpleUploadedFile('excel.csv', ('\ufeff' + HEADER + 'P-1,Pump,10.5,2.5,80\n').encode(),
+                               content_type='text/csv')
+        res = self.client.post('/api/upload/', {'file': f})
+        self.assertEqual(res.status_code, 201, res.content)
+        self.assertEqual(res.json()['summary']['total_count'], 1)
+
+    def test_overlong_header_is_not_decoded(self):
+        # A two-byte character straddles MAX_HEADER_BYTES; no newline follows.
+        name = 'x' * (MAX_HEADER_BYTES - 1) + 'é' * 2000
+        f = SimpleUploadedFile('long.csv', name.encode(), content_type='text/csv')
+        res = self.client.post('/api/upload/', {'file': f})
+        self.assertEqual(res.status_code, 400)
+        self.assertIn('Header row is longer', res.json()['file'])
+
+
+class QueryTests(MediaTestCase):
+    def test_percentiles_with_an_upload_without_accepted_rows(self):
+        ok = self.upload('ok.csv', 'P-1,Pump,10.5,2.5,80\nV-1,Valve,20.5,3.5,90\n')
+        empty = self.upload('rejected.csv', 'P-2,Pump,abc,2.5,80\n')
+        for spec in ({'uploads': [ok, empty], 'aggregations': ['p95']},
+                     {'uploads': [ok, empty], 'aggregations': ['p50'], 'group_by': 'type'}):
+            res = self.client.post('/api/query/', spec, content_type='application/json')
+            self.assertEqual(res.status_code, 200, res.content)
+            self.assertEqual(res.json()['rows'], 2)
+
+        res = self.client.post('/api/query/', {'uploads': [empty], 'aggregations': ['p95', 'mean']},
+                               content_type='application/json')
+        self.assertEqual(res.status_code, 200, res.content)
+        self.assertEqual(res.json()['rows'], 0)
+
+
+class ColumnStoreTests(SimpleTestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def roundtrip(self, rows):
+        return ColumnFile(write_columns(1, rows, 'hash'))
+
+    def test_mixed_numbers_and_missing_values(self):
+        rows = [
+            {'name': 'P-1', 'count': 3, 'flowrate': 1.5},
+            {'name': None, 'count': None, 'flowrate': 2},
+            {'name': 'P-1', 'count': -7, 'flowrate': None},
+        ]
+        store = self.roundtrip(rows)
+        self.assertEqual(store.data_hash, 'hash')
+        self.assertEqual(store.columns, ['name', 'count', 'flowrate'])
+        self.assertEqual(store.rows(), rows)
+        self.assertEqual([type(v) for v in store.column('count')], [int, type(None), int])
+        self.assertEqual(store.column('flowrate'), [1.5, 2.0, None])
+        self.assertEqual(store.categories('name'), ['P-1'])
+        self.assertEqual(store.codes('name').tolist(), [0, -1, 0])
+
+    def test_empty_upload(self):
+        store = self.roundtrip([])
+        self.assertEqual(len(store), 0)
+        self.assertEqual(store.columns, [])
+        self.assertEqual(store.rows(), [])
+        self.assertEqual(store.row_view()[:], [])
+
+    def test_slices_and_lazy_categories(self):
+        n = EAGER_CATEGORIES + 50
+        rows = [{'name': f'Unit-{i}', 'type': 'Pump' if i % 2 else 'Välve', 'flowrate': i * 0.5}
+                for i in range(n)]
+        store = self.roundtrip(rows)
+        self.assertEqual(len(store), n)
+        # Fewer rows than categories: decoded one by one, not all up front.
+        self.assertEqual(store.column('name', 10, 13), ['Unit-10', 'Unit-11', 'Unit-12'])
+        self.assertNotIn('name', store._categories)
+        self.assertEqual(store.rows(n - 2), rows[n - 2:])
+        self.assertEqual(store.rows(5, 5), [])
+        view = store.row_view()
+        self.assertEqual(view[100:110:3], rows[100:110:3])
+        self.assertEqual(view[-1], rows[-1])
+        with self.assertRaises(IndexError):
+            view[n]
+        self.assertEqual(store.column('name'), [r['name'] for r in rows])
+
+    def test_rebuilt_when_data_hash_differs(self):
+        write_columns(7, [{'flowrate': 1.0}], 'old')
+        upload = EquipmentUpload(pk=7, data=[{'flowrate': 2.0}], data_hash='new')
+        self.assertEqual(cached_columns(upload).rows(), [{'flowrate': 2.0}])
@@ -0,0 +1,103 @@
+"""Upload handler that streams CSV uploads to disk and rejects bad files early."""
+import csv
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+from django.http import QueryDict
+from django.utils.datastructures import MultiValueDict
+
+from .analytics import missing_columns
+
+# Give up looking for the end of the header row after this many bytes.
+MAX_HEADER_BYTES = 64 * 1024
+
+
+class UploadRejected(Exception):
+    """Reason an upload was refused; stored on ``request.upload_error``."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CSVUploadHandler(TemporaryFileUploadHandler):
+    """
+    Stream the upload to a temp file, checking size, extension and header row
+    as the bytes arrive so bad uploads are dropped without reading the body.
+    The SHA-256 of the raw bytes is computed on the way through and left on
+    the uploaded file as ``content_hash``.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_size = settings.EQUIPMENT_MAX_UPLOAD_SIZE
+        self.received = 0
+        self.header = b''
+        self.header_checked = False
+        self.digest = hashlib.sha256()
+
+    def _reject(self, message, status_code=400):
+        if self.request is not None:
+            self.request.upload_error = UploadRejected(message, status_code)
+        raise StopUpload(connection_reset=True)
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if self.max_size and content_length and content_length > self.max_size:
+            # Returning (POST, FILES) stops the parser before the body is read.
+            if self.request is not None:
+                self.request.upload_error = UploadRejected(
+                    f'File too large (limit {self.max_size} bytes).', 413)
+            return QueryDict(encoding=encoding), MultiValueDict()
+        return None
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        if not (file_name or '').lower().endswith('.csv'):
+            self._reject('Must be a CSV file.')
+        super().new_file(field_name, file_name, *args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.max_size and self.received > self.max_size:
+            self._reject(f'File too large (limit {self.max_size} bytes).', 413)
+        if not self.header_checked:
+            self.header += raw_data
+            if b'\n' in self.header:
+                self._check_header()
+            elif len(self.header) > MAX_HEADER_BYTES:
+                # Not decoded: the cut could fall inside a multi-byte character.
+                self._reject(f'Header row is longer than {MAX_HEADER_BYTES} bytes.')
+        self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if not self.header_checked:
+            self._check_header()
+        f = super().file_complete(file_size)
+        f.content_hash = self.digest.hexdigest()
+        return f
+
+    def _check_header(self):
+        self.header_checked = True
+        line = self.header.split(b'\n', 1)[0]
+        self.header = b''
+        try:
+            # utf-8-sig: Excel's "CSV UTF-8" export starts with a byte order mark.
+            text = line.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            self._reject('File is not valid UTF-8 text.')
+        missing = missing_columns(next(csv.reader([text.rstrip('\r')]), []))
+        if missing:
+            self._reject(f'Missing required columns: {missing}')
+
+
+def content_hash(f) -> str:
+    """SHA-256 of an uploaded file, reusing the digest taken while it streamed in."""
+    digest = getattr(f, 'content_hash', None)
+    if digest:
+        return digest
+    h = hashlib.sha256()
+    for chunk in f.chunks():
+        h.update(chunk)
+    f.seek(0)
+    return h.hexdigest()
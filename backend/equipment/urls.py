@@ -5,6 +5,10 @@ urlpatterns = [
     path('upload/', views.UploadView.as_view()),
     path('summary/<int:upload_id>/', views.SummaryView.as_view()),
     path('data/<int:upload_id>/', views.DataView.as_view()),
+    path('charts/<int:upload_id>/', views.ChartsView.as_view()),
     path('history/', views.HistoryView.as_view()),
+    path('equipment/history/', views.EquipmentHistoryView.as_view()),
+    path('query/', views.QueryView.as_view()),
     path('report/<int:upload_id>/pdf/', views.ReportPdfView.as_view()),
+    path('report/batch/', views.BatchReportView.as_view()),
 ]
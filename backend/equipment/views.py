@@ -1,53 +1,101 @@
-from io import BytesIO
-from django.http import FileResponse, Http404
+from django.http import FileResponse, Http404, StreamingHttpResponse
 from django.conf import settings
 from rest_framework import status
-from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import IsAuthenticated
 
-from .models import EquipmentUpload
-from .serializers import UploadSerializer
-from .analytics import parse_and_analyze
-from .pdf_report import build_pdf
+from .models import EquipmentReading, EquipmentUpload, retention_for
+from .serializers import EquipmentHistorySerializer, QuerySerializer, UploadSerializer
+from .analytics import ingest
+from .metrics import stage
+from .profiling import ProfiledAPIView
+from .query import cached_query
+from .upload_handlers import CSVUploadHandler, content_hash
 
+# charts and column_store (numpy), pdf_report and batch_reports (ReportLab) are
+# imported inside the views that need them, keeping worker boot free of those
+# imports.
 
-class UploadView(APIView):
+
+def _uploads(request):
+    # Every read is scoped to the caller; served by the (owner, created_at) index.
+    return EquipmentUpload.objects.filter(owner=request.user)
+
+
+class UploadView(ProfiledAPIView):
     parser_classes = (MultiPartParser, FormParser)
     permission_classes = [IsAuthenticated]
 
+    def initialize_request(self, request, *args, **kwargs):
+        # Must be set before anything (auth/CSRF included) touches the body.
+        request.upload_handlers = [CSVUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
     def post(self, request):
-        ser = UploadSerializer(data=request.data)
+        data = request.data
+        rejected = getattr(request._request, 'upload_error', None)
+        if rejected is not None:
+            return Response({'file': str(rejected)}, status=rejected.status_code)
+        ser = UploadSerializer(data=data)
         if not ser.is_valid():
             return Response(ser.errors, status=status.HTTP_400_BAD_REQUEST)
         f = ser.validated_data['file']
         if not (f.name or '').lower().endswith('.csv'):
             return Response({'file': 'Must be a CSV file.'}, status=status.HTTP_400_BAD_REQUEST)
-        try:
-            rows, summary = parse_and_analyze(f)
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
-        obj = EquipmentUpload.objects.create(
-            filename=f.name,
-            summary=summary,
-            data=rows,
-        )
-        EquipmentUpload.keep_last_n(5)
-        return Response({
-            'id': obj.id,
-            'filename': obj.filename,
-            'summary': obj.summary,
-            'created_at': obj.created_at.isoformat(),
-        }, status=status.HTTP_201_CREATED)
+        digest = content_hash(f)
+        # Byte-identical re-upload: skip parsing entirely.
+        obj = _duplicate(request, content_hash=digest)
+        if obj is None:
+            # CSVUploadHandler leaves the upload on disk; parse it from there.
+            source = f.temporary_file_path() if hasattr(f, 'temporary_file_path') else f
+            try:
+                fields = ingest(source)
+            except Exception as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            # Same rows in a differently laid-out file. A file that rejected
+            # other rows is a new upload: its quality report is its own.
+            obj = _duplicate(request, data_hash=fields['data_hash'])
+            if obj is not None and obj.quality != fields['quality']:
+                obj = None
+        if obj is not None:
+            with stage('persist'):
+                obj.reupload(f.name, f.size)
+            return _upload_response(obj, status.HTTP_200_OK, deduplicated=True)
+        from .column_store import write_columns
+        with stage('persist'):
+            obj = EquipmentUpload.objects.create(
+                owner=request.user, filename=f.name, size_bytes=f.size, content_hash=digest, **fields)
+            write_columns(obj.pk, fields['data'], fields['data_hash'])
+            EquipmentReading.record(obj, fields['data'])
+        quota = retention_for(request.user)
+        with stage('prune'):
+            EquipmentUpload.keep_last_n(quota['count'], owner=request.user, max_bytes=quota['bytes'])
+        return _upload_response(obj, status.HTTP_201_CREATED)
+
+
+def _duplicate(request, **hashes):
+    """The caller's upload with matching content, if any (rows are not loaded)."""
+    return _uploads(request).filter(**hashes).defer('data', 'charts').first()
 
 
-class SummaryView(APIView):
+def _upload_response(obj, status_code, deduplicated=False):
+    return Response({
+        'id': obj.id,
+        'filename': obj.filename,
+        'summary': obj.summary,
+        'quality': obj.quality,
+        'created_at': obj.created_at.isoformat(),
+        'deduplicated': deduplicated,
+    }, status=status_code)
+
+
+class SummaryView(ProfiledAPIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, upload_id):
         try:
-            obj = EquipmentUpload.objects.get(pk=upload_id)
+            obj = _uploads(request).defer('data', 'charts', 'quality').get(pk=upload_id)
         except EquipmentUpload.DoesNotExist:
             raise Http404
         return Response({
@@ -58,22 +106,98 @@ class SummaryView(APIView):
         })
 
 
-class DataView(APIView):
+def _int_param(request, name, default, minimum=0, maximum=None):
+    value = request.query_params.get(name)
+    if value in (None, ''):
+        return default
+    value = int(value)  # ValueError is reported by the caller
+    if value < minimum:
+        raise ValueError
+    return min(value, maximum) if maximum else value
+
+
+class DataView(ProfiledAPIView):
+    """
+    Rows of an upload. With ?offset=&limit= a page of at most MAX_PAGE_ROWS
+    rows is returned along with the total; ?layout=columns returns
+    {'columns': [...], 'values': [[column 0], [column 1], ...]} instead of row
+    dicts, which is smaller and needs no per-row work in the client. Pages are
+    sliced from the upload's memory-mapped column file.
+    """
     permission_classes = [IsAuthenticated]
+    MAX_PAGE_ROWS = 5000
 
     def get(self, request, upload_id):
+        # Not ?format=, which DRF reserves for choosing the renderer.
+        layout = request.query_params.get('layout') or 'rows'
+        if layout not in ('rows', 'columns'):
+            return Response({'layout': "Must be 'rows' or 'columns'."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            offset = _int_param(request, 'offset', 0)
+            limit = _int_param(request, 'limit', None, minimum=1, maximum=self.MAX_PAGE_ROWS)
+        except ValueError:
+            return Response({'detail': 'offset and limit must be non-negative integers.'},
+                            status=status.HTTP_400_BAD_REQUEST)
         try:
-            obj = EquipmentUpload.objects.get(pk=upload_id)
+            # Rows are read from the column file; the JSON is loaded only to rebuild it.
+            obj = _uploads(request).defer('data', 'charts', 'quality').get(pk=upload_id)
         except EquipmentUpload.DoesNotExist:
             raise Http404
-        return Response({'data': obj.data, 'filename': obj.filename})
+        from .column_store import cached_columns
+        store = cached_columns(obj)
+        stop = None if limit is None else offset + limit
+        out = {'filename': obj.filename, 'total': len(store), 'offset': offset}
+        if layout == 'columns':
+            out['columns'] = store.columns
+            out['values'] = [store.column(c, offset, stop) for c in store.columns]
+        else:
+            out['data'] = store.rows(offset, stop)
+        return Response(out)
 
 
-class HistoryView(APIView):
+class ChartsView(ProfiledAPIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, upload_id):
+        try:
+            obj = _uploads(request).defer('data').get(pk=upload_id)
+        except EquipmentUpload.DoesNotExist:
+            raise Http404
+        if not obj.charts and obj.summary.get('total_count'):
+            # Uploads stored before chart series existed: build once and keep.
+            from .charts import METRICS, build_chart_series
+            from .column_store import cached_columns
+            store = cached_columns(obj)
+            obj.charts = build_chart_series({m: store.numeric(m) for m in METRICS})
+            obj.save(update_fields=['charts'])
+        return Response({'id': obj.id, 'filename': obj.filename, 'charts': obj.charts})
+
+
+class QueryView(ProfiledAPIView):
+    """Filter, group and aggregate rows across the caller's uploads (see QuerySerializer)."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        ser = QuerySerializer(data=request.data)
+        if not ser.is_valid():
+            return Response(ser.errors, status=status.HTTP_400_BAD_REQUEST)
+        spec = dict(ser.validated_data)
+        qs = _uploads(request).order_by('-created_at')
+        if 'uploads' in spec:
+            qs = qs.filter(pk__in=spec.pop('uploads'))
+        if 'last' in spec:
+            qs = qs[:spec.pop('last')]
+        with stage('query'):
+            result = cached_query(qs, spec)
+        return Response(result)
+
+
+class HistoryView(ProfiledAPIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        qs = EquipmentUpload.objects.order_by('-created_at')[:5]
+        count = retention_for(request.user)['count']
+        qs = _uploads(request).defer('data', 'charts', 'quality').order_by('-created_at')[:count]
         out = [
             {
                 'id': o.id,
@@ -86,20 +210,89 @@ class HistoryView(APIView):
         return Response(out)
 
 
-class ReportPdfView(APIView):
+class EquipmentHistoryView(ProfiledAPIView):
+    """Flowrate, pressure and temperature of ?name=... units across the caller's uploads, oldest first."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        ser = EquipmentHistorySerializer(data={'name': request.query_params.getlist('name')})
+        if not ser.is_valid():
+            return Response(ser.errors, status=status.HTTP_400_BAD_REQUEST)
+        names = ser.validated_data['name']
+        out = {name: [] for name in names}
+        # One range scan of equipment_reading_name_idx per name.
+        readings = (EquipmentReading.objects
+                    .filter(owner=request.user, equipment_name__in=names)
+                    .order_by('equipment_name', 'recorded_at', 'id')
+                    .values_list('equipment_name', 'upload_id', 'recorded_at', 'type',
+                                 'flowrate', 'pressure', 'temperature'))
+        for name, upload_id, recorded_at, type_, flowrate, pressure, temperature in readings:
+            out[name].append({
+                'upload': upload_id,
+                'recorded_at': recorded_at.isoformat(),
+                'type': type_,
+                'flowrate': flowrate,
+                'pressure': pressure,
+                'temperature': temperature,
+            })
+        return Response({'equipment': out})
+
+
+def _bad_detail(detail):
+    from .pdf_report import DETAIL_LEVELS
+    if detail not in DETAIL_LEVELS:
+        return Response({'detail': f'Must be one of {list(DETAIL_LEVELS)}.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    return None
+
+
+class ReportPdfView(ProfiledAPIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, upload_id):
+        detail = request.query_params.get('detail') or settings.EQUIPMENT_REPORT_DETAIL
+        bad = _bad_detail(detail)
+        if bad:
+            return bad
         try:
-            obj = EquipmentUpload.objects.get(pk=upload_id)
+            # Rows are loaded lazily, only if the report is not cached yet.
+            obj = _uploads(request).defer('data', 'charts', 'quality').get(pk=upload_id)
         except EquipmentUpload.DoesNotExist:
             raise Http404
-        path = build_pdf(obj)
-        with open(path, 'rb') as f:
-            buf = BytesIO(f.read())
+        from .pdf_report import cached_pdf
+        with stage('render_pdf'):
+            path = cached_pdf(obj, detail)
+        # FileResponse streams the file in chunks and closes it when done.
         return FileResponse(
-            buf,
+            open(path, 'rb'),
             as_attachment=True,
             filename=f'report_{obj.filename}.pdf',
             content_type='application/pdf',
         )
+
+
+class BatchReportView(ProfiledAPIView):
+    """Zip of reports for ?ids=1,2,3 (default: all retained uploads), built in parallel."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        detail = request.query_params.get('detail') or settings.EQUIPMENT_REPORT_DETAIL
+        bad = _bad_detail(detail)
+        if bad:
+            return bad
+        qs = _uploads(request).defer('data', 'charts', 'quality')
+        ids = request.query_params.get('ids')
+        if ids:
+            try:
+                qs = qs.filter(pk__in=[int(i) for i in ids.split(',') if i.strip()])
+            except ValueError:
+                return Response({'ids': 'Must be a comma-separated list of upload ids.'},
+                                status=status.HTTP_400_BAD_REQUEST)
+        uploads = list(qs)
+        if not uploads:
+            raise Http404
+        from .batch_reports import report_archive
+        response = StreamingHttpResponse(report_archive(uploads, detail, settings.EQUIPMENT_REPORT_REQUEST_WORKERS),
+                                         content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename="reports.zip"'
+        return response
@@ -22,6 +22,7 @@ def _req(
     username: str,
     password: str,
     json: Optional[dict] = None,
+    params: Optional[dict] = None,
     files: Optional[dict] = None,
     stream: bool = False,
 ) -> requests.Response:
@@ -30,6 +31,8 @@ def _req(
     kwargs = {"headers": headers, "timeout": 30, "stream": stream}
     if json is not None:
         kwargs["json"] = json
+    if params is not None:
+        kwargs["params"] = params
     if files is not None:
         kwargs["files"] = files
         if "json" in kwargs:
@@ -60,7 +63,15 @@ def get_summary(upload_id: int, username: str, password: str) -> dict:
 
 
 def get_data(upload_id: int, username: str, password: str) -> dict:
-    r = _req("GET", f"/data/{upload_id}/", username=username, password=password)
+    """All rows of an upload as {"columns": [...], "values": [[column 0], ...]}."""
+    r = _req("GET", f"/data/{upload_id}/", username=username, password=password,
+             params={"layout": "columns"})
+    r.raise_for_status()
+    return r.json()
+
+
+def get_charts(upload_id: int, username: str, password: str) -> dict:
+    r = _req("GET", f"/charts/{upload_id}/", username=username, password=password)
     r.raise_for_status()
     return r.json()
 
@@ -71,6 +82,13 @@ def get_history(username: str, password: str) -> list:
     return r.json()
 
 
+def get_equipment_history(names: list, username: str, password: str) -> dict:
+    """Readings of the named units across uploads, oldest first: {"equipment": {name: [...]}}."""
+    r = _req("GET", "/equipment/history/", username=username, password=password, params={"name": list(names)})
+    r.raise_for_status()
+    return r.json()
+
+
 def download_pdf(upload_id: int, save_path: str, username: str, password: str) -> None:
     r = _req("GET", f"/report/{upload_id}/pdf/", username=username, password=password, stream=True)
     r.raise_for_status()
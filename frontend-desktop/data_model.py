@@ -0,0 +1,111 @@
+"""Columnar in-memory form of /api/data/ rows, shared by the table, charts and filters."""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+NAME_COL = "equipment name"
+TYPE_COL = "type"
+
+
+def _factorize(values):
+    """Return (int32 codes, object array of categories in first-seen order)."""
+    index = {}
+    codes = np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.int32, count=len(values))
+    categories = np.empty(len(index), dtype=object)
+    categories[:] = list(index)
+    return codes, categories
+
+
+class ColumnarData:
+    """
+    Rows stored column by column: numeric columns as float64 arrays (NaN for
+    missing), everything else as int32 codes into a category array. Row
+    subsets are index arrays, so filtering and sorting never copy the data.
+    """
+
+    def __init__(self, columns: List[str], numeric: Dict[str, np.ndarray],
+                 codes: Dict[str, np.ndarray], categories: Dict[str, np.ndarray]):
+        self.columns = columns
+        self.numeric = numeric
+        self.codes = codes
+        self.categories = categories
+        self._ranks = {}
+
+    @classmethod
+    def from_columns(cls, columns: List[str], values: List[list]) -> "ColumnarData":
+        """From a ?layout=columns response: `values[i]` holds every value of `columns[i]`."""
+        numeric, codes, categories = {}, {}, {}
+        for col, vals in zip(columns, values):
+            sample = next((v for v in vals if v is not None), None)
+            if isinstance(sample, (int, float)) and not isinstance(sample, bool):
+                numeric[col] = np.fromiter(
+                    (np.nan if v is None else v for v in vals), dtype=np.float64, count=len(vals))
+            else:
+                codes[col], categories[col] = _factorize(vals)
+        return cls(list(columns), numeric, codes, categories)
+
+    @classmethod
+    def from_rows(cls, rows: List[dict]) -> "ColumnarData":
+        columns = list(rows[0].keys()) if rows else []
+        return cls.from_columns(columns, [[r.get(col) for r in rows] for col in columns])
+
+    def __len__(self):
+        if self.numeric:
+            return len(next(iter(self.numeric.values())))
+        if self.codes:
+            return len(next(iter(self.codes.values())))
+        return 0
+
+    def display(self, row: int, col: str) -> str:
+        if col in self.numeric:
+            v = self.numeric[col][row]
+            if np.isnan(v):
+                return "—"
+            return str(int(v)) if v.is_integer() else str(round(float(v), 4))
+        v = self.categories[col][self.codes[col][row]]
+        return "—" if v is None else str(v)
+
+    def sort_keys(self, col: str) -> np.ndarray:
+        """Per-row keys ordering `col`; categories sort by their text."""
+        if col in self.numeric:
+            return self.numeric[col]
+        if col not in self._ranks:
+            cats = self.categories[col]
+            order = np.argsort(np.array(["" if c is None else str(c) for c in cats], dtype=object))
+            rank = np.empty(len(cats), dtype=np.int32)
+            rank[order] = np.arange(len(cats), dtype=np.int32)
+            self._ranks[col] = rank
+        return self._ranks[col][self.codes[col]]
+
+    def types(self) -> List[str]:
+        if TYPE_COL not in self.categories:
+            return []
+        return sorted(str(c) for c in self.categories[TYPE_COL] if c is not None)
+
+    def mask(self, type_: Optional[str] = None, name_contains: str = "") -> np.ndarray:
+        """Boolean row mask; string tests run once per category, not per row."""
+        mask = np.ones(len(self), dtype=bool)
+        if type_ and TYPE_COL in self.codes:
+            match = np.array([c == type_ for c in self.categories[TYPE_COL]], dtype=bool)
+            mask &= match[self.codes[TYPE_COL]]
+        if name_contains and NAME_COL in self.codes:
+            needle = name_contains.lower()
+            match = np.array([c is not None and needle in str(c).lower()
+                              for c in self.categories[NAME_COL]], dtype=bool)
+            mask &= match[self.codes[NAME_COL]]
+        return mask
+
+    def type_counts(self, rows: Optional[np.ndarray] = None) -> Dict[str, int]:
+        if TYPE_COL not in self.codes:
+            return {}
+        codes = self.codes[TYPE_COL] if rows is None else self.codes[TYPE_COL][rows]
+        counts = np.bincount(codes, minlength=len(self.categories[TYPE_COL]))
+        pairs = [(str(c), int(n)) for c, n in zip(self.categories[TYPE_COL], counts) if n]
+        return dict(sorted(pairs, key=lambda p: -p[1]))
+
+    def means(self, rows: Optional[np.ndarray] = None) -> Dict[str, float]:
+        out = {}
+        for col, values in self.numeric.items():
+            v = values if rows is None else values[rows]
+            out[col] = round(float(np.nanmean(v)), 4) if len(v) and not np.isnan(v).all() else 0.0
+        return out
@@ -5,8 +5,6 @@ import sys
 import os
 
 os.environ["QT_API"] = "qt5"
-import matplotlib
-matplotlib.use("Qt5Agg")
 
 from PyQt5.QtWidgets import (
     QApplication,
@@ -19,8 +17,8 @@ from PyQt5.QtWidgets import (
     QPushButton,
     QListWidget,
     QListWidgetItem,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
+    QComboBox,
     QFileDialog,
     QMessageBox,
     QGroupBox,
@@ -34,9 +32,7 @@ from PyQt5.QtWidgets import (
     QDialog,
     QDialogButtonBox,
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QAbstractTableModel, QModelIndex
 
 from api_client import (
     login,
@@ -44,6 +40,7 @@ from api_client import (
     get_summary,
     get_data,
     get_history,
+    get_equipment_history,
     download_pdf,
 )
 
@@ -143,13 +140,101 @@ class Worker(QThread):
 
 
 # ----- Matplotlib canvas -----
+# Matplotlib and its Qt backend are imported on the first chart render, not at
+# startup, so the login dialog appears without waiting for them.
 
+_mpl = None
 
-class MplCanvas(FigureCanvas):
-    def __init__(self, fig: Figure, parent=None):
-        super().__init__(fig)
-        self.setParent(parent)
-        self.setMinimumSize(320, 220)
+
+def _matplotlib():
+    """Return (Figure, MplCanvas), importing matplotlib on first use."""
+    global _mpl
+    if _mpl is None:
+        import matplotlib
+        matplotlib.use("Qt5Agg")
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+
+        class MplCanvas(FigureCanvas):
+            def __init__(self, fig: Figure, parent=None):
+                super().__init__(fig)
+                self.setParent(parent)
+                self.setMinimumSize(320, 220)
+
+        _mpl = Figure, MplCanvas
+    return _mpl
+
+
+# ----- Table model -----
+
+
+class ColumnarTableModel(QAbstractTableModel):
+    """Table view over ColumnarData; only visible cells are ever formatted."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.data_ = None
+        self.rows = ()  # visible row indices (an index array once data is set), filtered + sorted
+        self._sort = None  # (column index, Qt.SortOrder)
+
+    def set_data(self, data):
+        import numpy as np  # loaded with the first upload, not at startup
+
+        self.beginResetModel()
+        self.data_ = data
+        self.rows = np.arange(len(data), dtype=np.intp) if data is not None else np.empty(0, dtype=np.intp)
+        self._sort = None
+        self.endResetModel()
+
+    def set_filter(self, type_=None, name_contains=""):
+        if self.data_ is None:
+            return
+        import numpy as np
+
+        self.beginResetModel()
+        self.rows = np.flatnonzero(self.data_.mask(type_, name_contains))
+        self._apply_sort()
+        self.endResetModel()
+
+    def _apply_sort(self):
+        if self._sort is None or not len(self.rows):
+            return
+        import numpy as np
+
+        col, order = self._sort
+        keys = self.data_.sort_keys(self.data_.columns[col])[self.rows]
+        idx = np.argsort(keys, kind="stable")
+        if order == Qt.DescendingOrder:
+            idx = idx[::-1]
+        self.rows = self.rows[idx]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() or self.data_ is None else len(self.data_.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        return self.data_.display(self.rows[index.row()], self.data_.columns[index.column()])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal and self.data_ is not None:
+            return str(self.data_.columns[section]).replace("_", " ").title()
+        if orientation == Qt.Vertical:
+            return str(section + 1)
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if self.data_ is None:
+            return
+        self.layoutAboutToBeChanged.emit()
+        self._sort = (column, order)
+        self._apply_sort()
+        self.layoutChanged.emit()
 
 
 # ----- Main window -----
@@ -165,7 +250,7 @@ class MainWindow(QMainWindow):
         self.history = []
         self.selected = None
         self.summary = None
-        self.data = []
+        self.data = None  # ColumnarData of the selected upload
         self._workers = []
 
         central = QWidget()
@@ -223,11 +308,44 @@ class MainWindow(QMainWindow):
         self.charts_layout.setContentsMargins(0, 8, 0, 8)
         self.scroll_layout.addWidget(self.charts_widget)
 
-        self.table = QTableWidget()
+        filters = QHBoxLayout()
+        self.type_filter = QComboBox()
+        self.type_filter.addItem("All types")
+        self.type_filter.currentIndexChanged.connect(self._apply_filter)
+        self.name_filter = QLineEdit()
+        self.name_filter.setPlaceholderText("Filter by equipment name")
+        self.name_filter.textChanged.connect(self._apply_filter)
+        filters.addWidget(QLabel("Type"))
+        filters.addWidget(self.type_filter)
+        filters.addWidget(self.name_filter, 1)
+        self.scroll_layout.addLayout(filters)
+
+        self.table_model = ColumnarTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
         self.table.setAlternatingRowColors(True)
+        self.table.setSortingEnabled(True)
+        self.table.setMinimumHeight(300)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.doubleClicked.connect(self._trend_from_row)
         self.scroll_layout.addWidget(self.table)
 
+        trend = QHBoxLayout()
+        self.trend_input = QLineEdit()
+        self.trend_input.setPlaceholderText("Equipment names, comma-separated (or double-click a row)")
+        self.trend_input.returnPressed.connect(self._fetch_trend)
+        self.trend_btn = QPushButton("Show trend")
+        self.trend_btn.clicked.connect(self._fetch_trend)
+        trend.addWidget(QLabel("Trend"))
+        trend.addWidget(self.trend_input, 1)
+        trend.addWidget(self.trend_btn)
+        self.scroll_layout.addLayout(trend)
+
+        self.trend_widget = QWidget()
+        self.trend_layout = QVBoxLayout(self.trend_widget)
+        self.trend_layout.setContentsMargins(0, 8, 0, 8)
+        self.scroll_layout.addWidget(self.trend_widget)
+
         scroll.setWidget(scroll_content)
         right_layout.addWidget(scroll)
         split.addWidget(right)
@@ -349,11 +467,14 @@ class MainWindow(QMainWindow):
 
         def ok(pair):
             s, d = pair
+            from data_model import ColumnarData  # numpy, kept off the startup path
+
             self.summary = s
-            self.data = d.get("data") or []
+            self.data = ColumnarData.from_columns(d.get("columns") or [], d.get("values") or [])
             self._render_summary()
-            self._render_charts()
+            # The table first: it resets the row selection the charts read.
             self._render_table()
+            self._render_charts()
 
         self._run(do, on_result=ok)
 
@@ -365,9 +486,9 @@ class MainWindow(QMainWindow):
         self.summary_label.setText(
             f"<b>{s.get('filename', '')}</b><br><br>"
             f"Total count: <b>{tot}</b><br>"
-            f"Averages — Flowrate: <b>{av.get('flowrate', '—')}</b>, "
-            f"Pressure: <b>{av.get('pressure', '—')}</b>, "
-            f"Temperature: <b>{av.get('temperature', '—')}</b>"
+            f"Averages — Flowrate: <b>{av.get('flowrate') if av.get('flowrate') is not None else '—'}</b>, "
+            f"Pressure: <b>{av.get('pressure') if av.get('pressure') is not None else '—'}</b>, "
+            f"Temperature: <b>{av.get('temperature') if av.get('temperature') is not None else '—'}</b>"
         )
 
     def _render_charts(self):
@@ -375,12 +496,19 @@ class MainWindow(QMainWindow):
             child = self.charts_layout.takeAt(0)
             if child.widget():
                 child.widget().deleteLater()
-        sm = (self.summary or {}).get("summary") or self.summary or {}
-        dist = sm.get("type_distribution") or {}
-        av = sm.get("averages") or {}
+        if self.data is not None and len(self.data):
+            # Reflect the table's current filter.
+            rows = self.table_model.rows
+            dist = self.data.type_counts(rows)
+            av = self.data.means(rows) if len(rows) else {}
+        else:
+            sm = (self.summary or {}).get("summary") or self.summary or {}
+            dist = sm.get("type_distribution") or {}
+            av = sm.get("averages") or {}
         if not dist and not av:
             return
 
+        Figure, MplCanvas = _matplotlib()
         row = QHBoxLayout()
         if dist:
             fig = Figure(figsize=(5, 3), facecolor="#161b22")
@@ -409,7 +537,7 @@ class MainWindow(QMainWindow):
             ax2.spines["top"].set_visible(False)
             ax2.spines["right"].set_visible(False)
             keys = ["Flowrate", "Pressure", "Temperature"]
-            vals = [av.get("flowrate", 0), av.get("pressure", 0), av.get("temperature", 0)]
+            vals = [av.get("flowrate") or 0, av.get("pressure") or 0, av.get("temperature") or 0]
             ax2.bar(keys, vals, color=["#3fb950", "#d29922", "#f85149"], edgecolor="#30363d")
             ax2.set_ylabel("Average", color="#e6edf3")
             ax2.set_title("Averages", color="#e6edf3")
@@ -419,20 +547,84 @@ class MainWindow(QMainWindow):
         self.charts_layout.addLayout(row)
 
     def _render_table(self):
-        self.table.clear()
-        rows = self.data or []
-        if not rows:
-            self.table.setRowCount(0)
-            self.table.setColumnCount(0)
+        self.table_model.set_data(self.data)
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.type_filter.blockSignals(True)
+        self.type_filter.clear()
+        self.type_filter.addItem("All types")
+        self.type_filter.addItems(self.data.types() if self.data is not None else [])
+        self.type_filter.blockSignals(False)
+        self.name_filter.blockSignals(True)
+        self.name_filter.clear()
+        self.name_filter.blockSignals(False)
+
+    def _apply_filter(self, *_):
+        type_ = self.type_filter.currentText() if self.type_filter.currentIndex() > 0 else None
+        self.table_model.set_filter(type_, self.name_filter.text().strip())
+        self._render_charts()
+
+    def _trend_from_row(self, index):
+        if self.data is None or "equipment name" not in self.data.columns:
+            return
+        col = self.data.columns.index("equipment name")
+        name = self.table_model.data(self.table_model.index(index.row(), col))
+        if name and name != "—":
+            self.trend_input.setText(name)
+            self._fetch_trend()
+
+    def _fetch_trend(self):
+        names = [n.strip() for n in self.trend_input.text().split(",") if n.strip()]
+        if not names or not self.credentials:
+            return
+        u, p = self.credentials
+
+        def do():
+            return get_equipment_history(names, u, p)
+
+        def ok(res):
+            self._render_trend(res.get("equipment") or {})
+
+        self._run(do, on_result=ok)
+
+    def _render_trend(self, series):
+        """Flowrate, pressure and temperature of each named unit across uploads."""
+        while self.trend_layout.count():
+            child = self.trend_layout.takeAt(0)
+            if child.widget():
+                child.widget().deleteLater()
+        if not series:
+            return
+        if not any(series.values()):
+            self.trend_layout.addWidget(QLabel("No readings for " + ", ".join(series) + "."))
             return
-        cols = list(rows[0].keys())
-        self.table.setColumnCount(len(cols))
-        self.table.setRowCount(len(rows))
-        self.table.setHorizontalHeaderLabels([str(c).replace("_", " ").title() for c in cols])
-        for i, r in enumerate(rows):
-            for j, c in enumerate(cols):
-                v = r.get(c)
-                self.table.setItem(i, j, QTableWidgetItem(str(v) if v is not None else "—"))
+
+        from datetime import datetime
+
+        Figure, MplCanvas = _matplotlib()
+        fig = Figure(figsize=(8, 6), facecolor="#161b22")
+        metrics = ["flowrate", "pressure", "temperature"]
+        axes = fig.subplots(len(metrics), 1, sharex=True)
+        for ax, metric in zip(axes, metrics):
+            ax.set_facecolor("#161b22")
+            ax.tick_params(colors="#8b949e")
+            ax.spines["bottom"].set_color("#30363d")
+            ax.spines["left"].set_color("#30363d")
+            ax.spines["top"].set_visible(False)
+            ax.spines["right"].set_visible(False)
+            ax.set_ylabel(metric.capitalize(), color="#e6edf3")
+            for name, readings in series.items():
+                if not readings:
+                    continue
+                x = [datetime.fromisoformat(r["recorded_at"]) for r in readings]
+                y = [r[metric] if r[metric] is not None else float("nan") for r in readings]
+                ax.plot(x, y, marker="o", label=name)
+        axes[0].set_title("Equipment trend across uploads", color="#e6edf3")
+        axes[0].legend(facecolor="#161b22", edgecolor="#30363d", labelcolor="#e6edf3")
+        fig.autofmt_xdate()
+        fig.tight_layout()
+        canvas = MplCanvas(fig)
+        canvas.setMinimumHeight(420)
+        self.trend_layout.addWidget(canvas)
 
     def _download_pdf(self):
         if not self.selected:
@@ -457,11 +649,13 @@ class MainWindow(QMainWindow):
         self.history = []
         self.selected = None
         self.summary = None
-        self.data = []
+        self.data = None
         self.history_list.clear()
         self.summary_label.setText("Select an upload or upload a new CSV.")
-        self._render_charts()
         self._render_table()
+        self._render_charts()
+        self.trend_input.clear()
+        self._render_trend({})
         self.pdf_btn.setEnabled(False)
         self.user_label.setText("")
         self.hide()
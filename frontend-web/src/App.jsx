@@ -1,10 +1,20 @@
-import { useState, useCallback, useEffect } from 'react'
-import { uploadFile, getSummary, getData, getHistory, downloadReport } from './api'
-import { Chart as ChartJS, CategoryScale, LinearScale, BarElement, Title, Tooltip, Legend } from 'chart.js'
-import { Bar } from 'react-chartjs-2'
+import { useState, useCallback, useEffect, useRef } from 'react'
+import { uploadFile, getSummary, getDataPage, getCharts, getHistory, getEquipmentHistory, downloadReport } from './api'
+import {
+  Chart as ChartJS,
+  CategoryScale,
+  LinearScale,
+  BarElement,
+  LineElement,
+  PointElement,
+  Title,
+  Tooltip,
+  Legend,
+} from 'chart.js'
+import { Bar, Line } from 'react-chartjs-2'
 import styles from './App.module.css'
 
-ChartJS.register(CategoryScale, LinearScale, BarElement, Title, Tooltip, Legend)
+ChartJS.register(CategoryScale, LinearScale, BarElement, LineElement, PointElement, Title, Tooltip, Legend)
 
 const DEMO_USER = { username: 'admin', password: 'admin' }
 
@@ -52,30 +62,114 @@ function LoginForm({ onLogin, error }) {
   )
 }
 
-function DataTable({ data, columns }) {
-  if (!data?.length) return <p className={styles.muted}>No data.</p>
-  const cols = columns || (data[0] && Object.keys(data[0]))
+// Rows are fetched PAGE_ROWS at a time (parsed in a Web Worker) as they
+// scroll into view; only the visible rows are in the DOM.
+const ROW_HEIGHT = 32
+const GRID_HEIGHT = 480
+const PAGE_ROWS = 1000
+const OVERSCAN = 10
+const MAX_CACHED_PAGES = 40
+// Browsers cap element height (~17M px in Firefox); past this the scrollbar
+// maps proportionally onto rows instead of one pixel per pixel.
+const MAX_SCROLL_PX = 10_000_000
+
+function cellText(page, col, i) {
+  if (col in page.numeric) {
+    const v = page.numeric[col][i]
+    return Number.isNaN(v) ? '—' : String(v)
+  }
+  return page.text[col][i] ?? '—'
+}
+
+function DataGrid({ uploadId, total, credentials }) {
+  const [scrollTop, setScrollTop] = useState(0)
+  const [columns, setColumns] = useState(null)
+  const [error, setError] = useState('')
+  const [, setLoaded] = useState(0)
+  const pages = useRef(new Map()) // page number -> page, or null while loading
+  const current = useRef(uploadId)
+  const visiblePages = useRef([0, 0]) // [first, last] page on screen now
+  const bodyRef = useRef(null)
+
+  useEffect(() => {
+    current.current = uploadId
+    pages.current = new Map()
+    setColumns(null)
+    setError('')
+    setScrollTop(0)
+    if (bodyRef.current) bodyRef.current.scrollTop = 0
+  }, [uploadId])
+
+  const visible = Math.ceil(GRID_HEIGHT / ROW_HEIGHT)
+  const spacer = Math.min(total * ROW_HEIGHT, MAX_SCROLL_PX)
+  const maxScroll = Math.max(spacer - GRID_HEIGHT, 0)
+  const maxFirst = Math.max(total - GRID_HEIGHT / ROW_HEIGHT, 0)
+  const firstExact = maxScroll ? (Math.min(scrollTop, maxScroll) / maxScroll) * maxFirst : 0
+  const start = Math.max(Math.floor(firstExact) - OVERSCAN, 0)
+  const end = Math.min(Math.floor(firstExact) + visible + OVERSCAN, total)
+
+  useEffect(() => {
+    if (!uploadId || !total) return
+    const firstPage = Math.floor(start / PAGE_ROWS)
+    const lastPage = Math.floor(Math.max(end - 1, 0) / PAGE_ROWS)
+    visiblePages.current = [firstPage, lastPage]
+    for (let p = firstPage; p <= lastPage; p++) {
+      if (pages.current.has(p)) continue
+      pages.current.set(p, null)
+      getDataPage(uploadId, p * PAGE_ROWS, PAGE_ROWS, credentials)
+        .then((page) => {
+          if (current.current !== uploadId) return
+          pages.current.set(p, page)
+          // Drop the pages loaded longest ago, keeping the ones on screen
+          // now (the view may have moved while this page was in flight).
+          const [onScreenFirst, onScreenLast] = visiblePages.current
+          for (const key of pages.current.keys()) {
+            if (pages.current.size <= MAX_CACHED_PAGES) break
+            if (key < onScreenFirst || key > onScreenLast) pages.current.delete(key)
+          }
+          setColumns((c) => c || page.columns)
+          setLoaded((n) => n + 1)
+        })
+        .catch((e) => {
+          if (current.current !== uploadId) return
+          pages.current.delete(p)
+          setError(e.message || 'Failed to load data')
+        })
+    }
+  }, [uploadId, total, start, end, credentials])
+
+  if (!total) return <p className={styles.muted}>No data.</p>
+
+  const template = (columns || []).map((c) => (c === 'equipment name' ? '2fr' : '1fr')).join(' ')
+  const rows = []
+  for (let i = start; i < end; i++) {
+    const page = pages.current.get(Math.floor(i / PAGE_ROWS))
+    const top = scrollTop + (i - firstExact) * ROW_HEIGHT
+    rows.push(
+      <div key={i} className={styles.gridRow} style={{ top, height: ROW_HEIGHT, gridTemplateColumns: template }}>
+        {page && columns
+          ? columns.map((col) => <span key={col}>{cellText(page, col, i - page.offset)}</span>)
+          : <span className={styles.muted}>Loading…</span>}
+      </div>
+    )
+  }
 
   return (
     <div className={styles.tableWrap}>
-      <table className={styles.table}>
-        <thead>
-          <tr>
-            {cols.map((c) => (
-              <th key={c}>{String(c).replace(/_/g, ' ')}</th>
-            ))}
-          </tr>
-        </thead>
-        <tbody>
-          {data.map((row, i) => (
-            <tr key={i}>
-              {cols.map((col) => (
-                <td key={col}>{row[col] ?? '—'}</td>
-              ))}
-            </tr>
-          ))}
-        </tbody>
-      </table>
+      {error && <p className={styles.error}>{error}</p>}
+      <div className={styles.gridHeader} style={{ gridTemplateColumns: template }}>
+        {(columns || []).map((c) => (
+          <span key={c}>{String(c).replace(/_/g, ' ')}</span>
+        ))}
+      </div>
+      <div
+        ref={bodyRef}
+        className={styles.gridBody}
+        style={{ height: Math.min(GRID_HEIGHT, spacer) }}
+        onScroll={(e) => setScrollTop(e.currentTarget.scrollTop)}
+      >
+        <div style={{ height: spacer, position: 'relative' }}>{rows}</div>
+      </div>
     </div>
   )
 }
@@ -142,6 +236,145 @@ function SummaryCharts({ summary }) {
   )
 }
 
+const HISTOGRAM_COLORS = {
+  flowrate: ['rgba(63, 185, 80, 0.6)', 'rgb(63, 185, 80)'],
+  pressure: ['rgba(210, 153, 34, 0.6)', 'rgb(210, 153, 34)'],
+  temperature: ['rgba(248, 81, 73, 0.6)', 'rgb(248, 81, 73)'],
+}
+
+// Histograms precomputed by the server (/charts/), so no rows are needed here.
+function DistributionCharts({ charts }) {
+  const histograms = charts?.histograms
+  if (!histograms || !Object.keys(histograms).length) return null
+
+  const opts = {
+    responsive: true,
+    maintainAspectRatio: false,
+    plugins: {
+      legend: { display: false },
+    },
+    scales: {
+      x: { ticks: { maxRotation: 45 } },
+      y: { beginAtZero: true },
+    },
+  }
+
+  return (
+    <div className={styles.charts}>
+      {Object.entries(histograms).map(([metric, h]) => {
+        const [fill, border] = HISTOGRAM_COLORS[metric] || ['rgba(88, 166, 255, 0.6)', 'rgb(88, 166, 255)']
+        const data = {
+          labels: h.counts.map((_, i) => `${h.edges[i]}–${h.edges[i + 1]}`),
+          datasets: [
+            {
+              label: 'Count',
+              data: h.counts,
+              backgroundColor: fill,
+              borderColor: border,
+              borderWidth: 1,
+            },
+          ],
+        }
+        return (
+          <div key={metric} className={styles.chartBox}>
+            <h3>{metric.charAt(0).toUpperCase() + metric.slice(1)} distribution</h3>
+            <div className={styles.chartInner}>
+              <Bar data={data} options={opts} />
+            </div>
+          </div>
+        )
+      })}
+    </div>
+  )
+}
+
+const TREND_COLORS = ['rgb(88, 166, 255)', 'rgb(63, 185, 80)', 'rgb(210, 153, 34)', 'rgb(248, 81, 73)', 'rgb(188, 140, 255)']
+
+// Readings of named units across the caller's uploads (/equipment/history/).
+function EquipmentTrend({ credentials }) {
+  const [names, setNames] = useState('')
+  const [series, setSeries] = useState(null)
+  const [error, setError] = useState('')
+  const [loading, setLoading] = useState(false)
+
+  const handleSubmit = async (e) => {
+    e.preventDefault()
+    const list = names.split(',').map((n) => n.trim()).filter(Boolean)
+    if (!list.length) return
+    setLoading(true)
+    setError('')
+    try {
+      const res = await getEquipmentHistory(list, credentials)
+      setSeries(res.equipment || {})
+    } catch (err) {
+      setError(err.message || 'Failed to load trend')
+    } finally {
+      setLoading(false)
+    }
+  }
+
+  const withReadings = Object.entries(series || {}).filter(([, readings]) => readings.length)
+  // One x axis for every unit: the upload times any of them was recorded at.
+  const times = [...new Set(withReadings.flatMap(([, readings]) => readings.map((r) => r.recorded_at)))].sort()
+
+  const opts = {
+    responsive: true,
+    maintainAspectRatio: false,
+    spanGaps: true,
+    plugins: {
+      legend: { display: withReadings.length > 1 },
+    },
+  }
+
+  return (
+    <section className={styles.section}>
+      <h3>Equipment trend</h3>
+      <form onSubmit={handleSubmit} className={styles.trendForm}>
+        <input
+          type="text"
+          placeholder="Equipment names, comma-separated"
+          value={names}
+          onChange={(e) => setNames(e.target.value)}
+          className={styles.input}
+        />
+        <button type="submit" className={styles.btnSecondary} disabled={loading}>
+          {loading ? 'Loading…' : 'Show trend'}
+        </button>
+      </form>
+      {error && <p className={styles.error}>{error}</p>}
+      {series && !withReadings.length && (
+        <p className={styles.muted}>No readings for {Object.keys(series).join(', ')}.</p>
+      )}
+      {withReadings.length > 0 && (
+        <div className={styles.charts}>
+          {['flowrate', 'pressure', 'temperature'].map((metric) => {
+            const data = {
+              labels: times.map((t) => new Date(t).toLocaleString()),
+              datasets: withReadings.map(([name, readings], i) => {
+                const byTime = new Map(readings.map((r) => [r.recorded_at, r[metric]]))
+                return {
+                  label: name,
+                  data: times.map((t) => byTime.get(t) ?? null),
+                  borderColor: TREND_COLORS[i % TREND_COLORS.length],
+                  backgroundColor: TREND_COLORS[i % TREND_COLORS.length],
+                }
+              }),
+            }
+            return (
+              <div key={metric} className={styles.chartBox}>
+                <h3>{metric.charAt(0).toUpperCase() + metric.slice(1)}</h3>
+                <div className={styles.chartInner}>
+                  <Line data={data} options={opts} />
+                </div>
+              </div>
+            )
+          })}
+        </div>
+      )}
+    </section>
+  )
+}
+
 export default function App() {
   const [credentials, setCredentials] = useState(null)
   const [authError, setAuthError] = useState('')
@@ -149,7 +382,7 @@ export default function App() {
   const [history, setHistory] = useState([])
   const [selected, setSelected] = useState(null)
   const [summary, setSummary] = useState(null)
-  const [data, setData] = useState([])
+  const [charts, setCharts] = useState(null)
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState('')
   const [pdfLoading, setPdfLoading] = useState(false)
@@ -175,12 +408,12 @@ export default function App() {
     setLoading(true)
     setError('')
     try {
-      const [s, d] = await Promise.all([
+      const [s, c] = await Promise.all([
         getSummary(id, credentials),
-        getData(id, credentials),
+        getCharts(id, credentials),
       ])
       setSummary(s)
-      setData(d.data || [])
+      setCharts(c.charts || null)
     } catch (e) {
       setError(e.message || 'Failed to load')
     } finally {
@@ -210,8 +443,6 @@ export default function App() {
       setHistory((prev) => [res, ...prev.filter((x) => x.id !== res.id)])
       setSelected(res)
       setSummary({ summary: res.summary, filename: res.filename })
-      const d = await getData(res.id, credentials)
-      setData(d.data || [])
     } catch (err) {
       setError(err.message || 'Upload failed')
     } finally {
@@ -330,14 +561,20 @@ export default function App() {
                     , Temperature: <strong>{summary.summary?.averages?.temperature ?? summary.averages?.temperature}</strong>
                   </p>
                   <SummaryCharts summary={summary.summary || summary} />
+                  <DistributionCharts charts={charts} />
                 </section>
               )}
               <section className={styles.section}>
                 <h3>Data table</h3>
-                <DataTable data={data} />
+                <DataGrid
+                  uploadId={selected.id}
+                  total={summary?.summary?.total_count ?? selected.summary?.total_count ?? 0}
+                  credentials={credentials}
+                />
               </section>
             </>
           )}
+          <EquipmentTrend credentials={credentials} />
           {!selected && !loading && (
             <p className={styles.muted}>Upload a CSV or select an item from history.</p>
           )}
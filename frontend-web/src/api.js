@@ -58,6 +58,51 @@ export async function getData(uploadId, credentials) {
   return api('GET', `/data/${uploadId}/`, { credentials });
 }
 
+let dataWorker = null;
+let nextRequestId = 0;
+const pending = new Map();
+
+function worker() {
+  if (!dataWorker) {
+    dataWorker = new Worker(new URL('./dataWorker.js', import.meta.url), { type: 'module' });
+    dataWorker.onmessage = (e) => {
+      const { id, page, error, status } = e.data;
+      const p = pending.get(id);
+      if (!p) return;
+      pending.delete(id);
+      if (error) {
+        const err = new Error(error);
+        err.status = status;
+        p.reject(err);
+      } else {
+        p.resolve(page);
+      }
+    };
+  }
+  return dataWorker;
+}
+
+// One page of rows, fetched and parsed in a Web Worker. Resolves to
+// { total, offset, length, columns, numeric: {col: Float64Array}, text: {col: [...]} }.
+export function getDataPage(uploadId, offset, limit, credentials) {
+  const id = nextRequestId++;
+  const url = new URL(`${API_BASE}/data/${uploadId}/?layout=columns&offset=${offset}&limit=${limit}`, window.location.href);
+  return new Promise((resolve, reject) => {
+    pending.set(id, { resolve, reject });
+    worker().postMessage({ id, url: url.href, headers: getAuthHeader(credentials) });
+  });
+}
+
+export async function getCharts(uploadId, credentials) {
+  return api('GET', `/charts/${uploadId}/`, { credentials });
+}
+
+// Readings of the named units across your uploads, oldest first: { equipment: { name: [...] } }.
+export async function getEquipmentHistory(names, credentials) {
+  const query = names.map((n) => `name=${encodeURIComponent(n)}`).join('&');
+  return api('GET', `/equipment/history/?${query}`, { credentials });
+}
+
 export async function getHistory(credentials) {
   return api('GET', '/history/', { credentials });
 }
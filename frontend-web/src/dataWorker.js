@@ -0,0 +1,50 @@
+// Fetches and parses /data/ pages off the main thread.
+//
+// Pages are requested with ?layout=columns; numeric columns come back as
+// Float64Arrays (transferred, not copied) and text columns as plain arrays.
+// Messages in:  { id, url, headers }
+// Messages out: { id, page: { total, offset, length, columns, numeric, text } } or { id, error, status }
+
+function toPage(body) {
+  const columns = body.columns || [];
+  const values = body.values || [];
+  const numeric = {};
+  const text = {};
+  const transfer = [];
+  columns.forEach((col, i) => {
+    const v = values[i] || [];
+    const sample = v.find((x) => x !== null && x !== undefined);
+    if (typeof sample === 'number') {
+      const arr = new Float64Array(v.length);
+      for (let j = 0; j < v.length; j++) arr[j] = v[j] ?? NaN;
+      numeric[col] = arr;
+      transfer.push(arr.buffer);
+    } else {
+      text[col] = v;
+    }
+  });
+  const length = values.length ? values[0].length : 0;
+  return { page: { total: body.total, offset: body.offset, length, columns, numeric, text }, transfer };
+}
+
+self.onmessage = async (e) => {
+  const { id, url, headers } = e.data;
+  try {
+    const res = await fetch(url, { method: 'GET', headers, credentials: 'omit' });
+    const text = await res.text();
+    let body = null;
+    try {
+      body = text ? JSON.parse(text) : null;
+    } catch {
+      body = null;
+    }
+    if (!res.ok) {
+      self.postMessage({ id, error: body?.error || body?.detail || res.statusText || `HTTP ${res.status}`, status: res.status });
+      return;
+    }
+    const { page, transfer } = toPage(body || {});
+    self.postMessage({ id, page }, transfer);
+  } catch (err) {
+    self.postMessage({ id, error: err.message || 'Failed to load data' });
+  }
+};